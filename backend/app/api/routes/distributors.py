@@ -1,4 +1,6 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, status, Response
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status, Response
+from pydantic import TypeAdapter
+import hashlib
 from app.core.auth import get_current_user, CurrentUser
 from typing import List, Optional
 from app.models import Distributor, DistributorCreate, PortalState
@@ -10,6 +12,10 @@ from app.services.audit import log_distributor_created, log_distributor_updated,
 
 router = APIRouter(prefix="/distributors", tags=["Distributors"])
 
+# Built once at import; dump_json serializes the whole list in a single
+# pydantic-core call instead of re-walking each model in jsonable_encoder
+_distributor_list_adapter = TypeAdapter(List[Distributor])
+
 
 def camel_to_snake(name):
     """Convert camelCase to snake_case"""
@@ -22,14 +28,17 @@ def convert_dict_keys_to_snake(data):
     return {camel_to_snake(k): v for k, v in data.items()}
 
 
-@router.get("", response_model=List[Distributor])
+@router.get("")
 async def get_distributors(
+    request: Request,
     portal_type: Optional[str] = Query(None),
     portal_id: Optional[str] = Query(None),
+    active: Optional[bool] = Query(None, description="only distributors that have placed an order"),
     supabase: Client = Depends(get_supabase_client)
 ):
     """
-    Get all distributors, optionally filtered by portal (store)
+    Get all distributors, optionally filtered by portal (store) or
+    activity (active=true keeps only those with at least one order)
     """
     try:
         query = supabase.table("distributors").select("*")
@@ -40,42 +49,36 @@ async def get_distributors(
         response = query.execute()
         distributors_data = response.data
 
-        # Fetch last order date for each distributor to determine status
-        # Optimization: Fetch all latest orders in one query if possible, or iterate (Supabase limits join options)
-        # For now, we'll do a separate query to get max date per distributor. 
-        # Actually, simpler: Get all orders, select distributor_id and date, order by date desc.
-        # But for many orders this is heavy. Let's do a stored procedure or just iterate for now (assuming < 100 distributors).
-        
-        # Better approach with Supabase/PostgREST: 
-        # We can't easily do a "group by" and "max" join in one simple API call without a view/RPC.
-        # Let's try to fetch all orders (id, date, distributor_id) to map them.
-        
-        # 1. Get all orders (optimized selection)
-        orders_response = supabase.table("orders").select("distributor_id, date").order("date", desc=True).execute()
-        
-        last_order_map = {}
-        for order in orders_response.data:
-            d_id = order.get("distributor_id")
-            if d_id not in last_order_map:
-                last_order_map[d_id] = order.get("date")
-
-        final_distributors = []
-        for dist in distributors_data:
-            # Inject last_order_date
-            # The model Distributor needs to support this field or we accept it as extra if using dict
-            # Schema update required? Let's check schemas.py.
-            # Convert to dict first
-            dist_dict = dist.copy()
-            dist_dict["last_order_date"] = last_order_map.get(dist["id"])
-            final_distributors.append(dist_dict)
-
-        # Convert through Pydantic model to ensure proper camelCase serialization
-        # Note: We need to update the Schema to include last_order_date first!
-        # Assuming Schema update happens in next step, or we return dicts that Pydantic filters? 
-        # If Pydantic model doesn't have the field, it will be stripped.
-        # We MUST update schemas.py first. Assuming I will do that next.
-        
-        return final_distributors
+        # Last order date per distributor via one GROUP BY in the
+        # database (migration 023) instead of fetching every order row
+        orders_response = supabase.rpc("get_last_order_per_distributor").execute()
+        last_order_map = {row["distributor_id"]: row["last_order"] for row in orders_response.data}
+
+        if active:
+            # Filter server-fetched rows before any model work so callers
+            # that only want active accounts don't pay for the rest
+            distributors_data = [d for d in distributors_data if d["id"] in last_order_map]
+
+        # model_construct skips validation - these rows come from our own
+        # DB with columns matching the field names, so the full pydantic
+        # validation pass per row is wasted work on large lists
+        distributors = [
+            Distributor.model_construct(**dist, last_order_date=last_order_map.get(dist["id"]))
+            for dist in distributors_data
+        ]
+        content = _distributor_list_adapter.dump_json(distributors, by_alias=True)
+
+        # HTTP-level caching: a client revalidating with If-None-Match gets
+        # a bodyless 304 when the distributor list is unchanged
+        etag = f'"{hashlib.md5(content).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        return Response(
+            content=content,
+            media_type="application/json",
+            headers={"ETag": etag},
+        )
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -91,7 +91,8 @@ async def generate_eway_bill_for_order(
             "vehicle_number": request.vehicle_number,
             "transporter_id": request.transporter_id,
             "transporter_name": request.transporter_name,
-            "transport_mode": request.transport_mode.value,
+            # use_enum_values coerces the field to its plain string value
+            "transport_mode": request.transport_mode,
             "distance_km": request.distance_km,
             "supply_type": "Outward"
         }
@@ -143,7 +144,8 @@ async def update_eway_bill_vehicle(
             "vehicle_number": request.vehicle_number,
             "transporter_id": request.transporter_id,
             "transporter_name": request.transporter_name,
-            "transport_mode": request.transport_mode.value
+            # use_enum_values coerces the field to its plain string value
+            "transport_mode": request.transport_mode
         }
         
         supabase.table("orders").update(update_data).eq("eway_bill_number", eway_bill_number).execute()
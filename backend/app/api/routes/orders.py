@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends, Query, status, Response
+from pydantic import TypeAdapter
 from typing import List, Optional
 from app.models import Order, OrderCreate, OrderItem, OrderStatus
 from app.core.supabase import get_supabase_client, get_supabase_admin_client
@@ -13,8 +14,13 @@ router = APIRouter(prefix="/orders", tags=["Orders"])
 
 PLANT_LOCATION_ID = "plant"
 
+# Built once at import; dump_json serializes the whole list in a single
+# pydantic-core call instead of re-walking each model in jsonable_encoder
+_order_list_adapter = TypeAdapter(List[Order])
+_order_item_list_adapter = TypeAdapter(List[OrderItem])
 
-@router.get("", response_model=List[Order])
+
+@router.get("")
 async def get_orders(
     portal_type: Optional[str] = Query(None),
     portal_id: Optional[str] = Query(None),
@@ -45,12 +51,18 @@ async def get_orders(
             query = query.lte("date", end_date)
 
         response = query.order("date", desc=True).execute()
-        return response.data
+        # model_construct skips validation - these rows come from our own
+        # DB and order histories run long
+        orders = [Order.model_construct(**row) for row in response.data]
+        return Response(
+            content=_order_list_adapter.dump_json(orders, by_alias=True),
+            media_type="application/json",
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{order_id}/items", response_model=List[OrderItem])
+@router.get("/{order_id}/items")
 async def get_order_items(
     order_id: str,
     supabase: Client = Depends(get_supabase_client)
@@ -60,7 +72,14 @@ async def get_order_items(
     """
     try:
         response = supabase.table("order_items").select("*, skus(name, hsn_code, gst_percentage)").eq("order_id", order_id).execute()
-        return response.data
+        # model_construct drops the embedded skus(...) join and extra
+        # columns exactly like response_model validation did, minus the
+        # per-row validation cost
+        items = [OrderItem.model_construct(**row) for row in response.data]
+        return Response(
+            content=_order_item_list_adapter.dump_json(items, by_alias=True),
+            media_type="application/json",
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -86,17 +105,17 @@ async def create_order(
         for item in order_data.items:
             print(f"[DEBUG] Processing item: {item}")
             # Verify SKU exists and get price, GST, and carton_size
-            sku_response = supabase.table("skus").select("id, name, price, gst_percentage, carton_size").eq("id", item.skuId).execute()
+            sku_response = supabase.table("skus").select("id, name, price, gst_percentage, carton_size").eq("id", item.sku_id).execute()
             print(f"[DEBUG] SKU response: {sku_response.data}")
             if not sku_response.data or len(sku_response.data) == 0:
-                raise HTTPException(status_code=404, detail=f"SKU {item.skuId} not found")
+                raise HTTPException(status_code=404, detail=f"SKU {item.sku_id} not found")
 
             sku = sku_response.data[0]
 
             # Use provided unit price (from price tiers) or default SKU price
             # Note: unit_price is the GROSS price (already includes GST)
-            unit_price = item.unitPrice if item.unitPrice is not None else sku["price"]
-            is_freebie = item.isFreebie if item.isFreebie is not None else False
+            unit_price = item.unit_price if item.unit_price is not None else sku["price"]
+            is_freebie = item.is_freebie if item.is_freebie is not None else False
 
             # Calculate item total (freebies don't add to total)
             # unitPrice already includes GST, so we don't multiply by gst_multiplier
@@ -114,7 +133,7 @@ async def create_order(
             print(f"[DEBUG] Item processed. Total so far: {total_amount}, Shipment size: {item_shipment_size}")
 
             order_items.append({
-                "skuId": item.skuId,
+                "skuId": item.sku_id,
                 "quantity": item.quantity,
                 "unitPrice": unit_price,
                 "isFreebie": is_freebie,
@@ -122,26 +141,26 @@ async def create_order(
             })
 
         # Check wallet balance
-        print(f"[DEBUG] Checking wallet for distributor: {order_data.distributorId}, total: {total_amount}")
-        distributor = supabase.table("distributors").select("wallet_balance, credit_limit").eq("id", order_data.distributorId).single().execute()
+        print(f"[DEBUG] Checking wallet for distributor: {order_data.distributor_id}, total: {total_amount}")
+        distributor = supabase.table("distributors").select("wallet_balance, credit_limit").eq("id", order_data.distributor_id).single().execute()
         # Allow negative balance for special concessions/management approval
         # Check wallet balance but only log warning if insufficient
         available_balance = distributor.data["wallet_balance"] + distributor.data.get("credit_limit", 0)
         if total_amount > available_balance:
-            print(f"[WARNING] Negative balance order: Has {available_balance}, Needs {total_amount} for distributor {order_data.distributorId}. Allowing with management approval.")
+            print(f"[WARNING] Negative balance order: Has {available_balance}, Needs {total_amount} for distributor {order_data.distributor_id}. Allowing with management approval.")
         # Order will proceed regardless of balance
 
         # Create order
         order_id = f"ORD-{int(datetime.utcnow().timestamp() * 1000)}"
         order_obj = {
             "id": order_id,
-            "distributor_id": order_data.distributorId,
+            "distributor_id": order_data.distributor_id,
             "date": datetime.utcnow().isoformat(),
             "total_amount": total_amount,
             "shipment_size": total_shipment_size,
             "status": OrderStatus.PENDING.value,
             "placed_by_exec_id": current_user.email,
-            "approval_granted_by": order_data.approvalGrantedBy
+            "approval_granted_by": order_data.approval_granted_by
         }
 
         order_response = supabase.table("orders").insert(order_obj).execute()
@@ -159,34 +178,35 @@ async def create_order(
                 "returned_quantity": item["returnedQuantity"]
             }).execute()
 
-        # Reserve stock at Plant
+        # Reserve stock at Plant: one relative UPDATE per SKU via the
+        # adjust_stock_item RPC (migration 013), so a concurrent
+        # production or delivery between read and write can't be
+        # overwritten with a stale quantity
         for item in order_items:
-            # Check if stock exists
-            existing_stock = supabase.table("stock_items").select("reserved").eq("location_id", PLANT_LOCATION_ID).eq("sku_id", item["skuId"]).execute()
-            
-            if existing_stock.data:
-                new_reserved = existing_stock.data[0]["reserved"] + item["quantity"]
-                supabase.table("stock_items").update({"reserved": new_reserved}).eq("location_id", PLANT_LOCATION_ID).eq("sku_id", item["skuId"]).execute()
-            else:
-                # Initialize stock record if missing (unlikely for Plant but safe)
+            adjusted = supabase.rpc("adjust_stock_item", {
+                "p_location_id": PLANT_LOCATION_ID,
+                "p_sku_id": item["skuId"],
+                "p_quantity_delta": 0,
+                "p_reserved_delta": item["quantity"]
+            }).execute()
+
+            if not adjusted.data:
+                # No Plant row yet for this SKU (unlikely but safe):
+                # seed one holding only the reservation
                 supabase.table("stock_items").insert({
                     "location_id": PLANT_LOCATION_ID,
                     "sku_id": item["skuId"],
-                    "quantity": 0, # Assume 0 on hand if record missing
+                    "quantity": 0,
                     "reserved": item["quantity"]
                 }).execute()
 
-        # Deduct from wallet
-        new_balance = distributor.data["wallet_balance"] - total_amount
-        supabase.table("distributors").update({"wallet_balance": new_balance}).eq("id", order_data.distributorId).execute()
-
-        # Record wallet transaction
+        # Deduct from wallet: insert-only - the migration 016 triggers
+        # stamp balance_after and keep distributors.wallet_balance in sync
         supabase.table("wallet_transactions").insert({
-            "distributor_id": order_data.distributorId,
+            "distributor_id": order_data.distributor_id,
             "date": datetime.utcnow().isoformat(),
             "type": "ORDER_PAYMENT",
             "amount": -total_amount,
-            "balance_after": new_balance,
             "order_id": order_id,
             "initiated_by": current_user.email
         }).execute()
@@ -196,7 +216,7 @@ async def create_order(
             order_id=order_id,
             user_id=current_user.id,
             username=current_user.email,
-            order_data={"distributor_id": order_data.distributorId, "total_amount": total_amount, "items_count": len(order_items)}
+            order_data={"distributor_id": order_data.distributor_id, "total_amount": total_amount, "items_count": len(order_items)}
         )
 
         return order_response.data[0]
@@ -235,15 +255,15 @@ async def update_order_items(
 
         for item in order_data.items:
             # Verify SKU exists and get price + GST
-            sku_response = supabase.table("skus").select("id, name, price, gst_percentage").eq("id", item.skuId).execute()
+            sku_response = supabase.table("skus").select("id, name, price, gst_percentage").eq("id", item.sku_id).execute()
             if not sku_response.data or len(sku_response.data) == 0:
-                raise HTTPException(status_code=404, detail=f"SKU {item.skuId} not found")
+                raise HTTPException(status_code=404, detail=f"SKU {item.sku_id} not found")
 
             sku = sku_response.data[0]
 
             # Use provided unit price (from price tiers) or default SKU price
-            unit_price = item.unitPrice if item.unitPrice is not None else sku["price"]
-            is_freebie = item.isFreebie if item.isFreebie is not None else False
+            unit_price = item.unit_price if item.unit_price is not None else sku["price"]
+            is_freebie = item.is_freebie if item.is_freebie is not None else False
 
             # Calculate item total with GST (freebies don't add to total)
             if not is_freebie:
@@ -252,7 +272,7 @@ async def update_order_items(
                 total_amount += item_total
 
             order_items.append({
-                "skuId": item.skuId,
+                "skuId": item.sku_id,
                 "quantity": item.quantity,
                 "unitPrice": unit_price,
                 "isFreebie": is_freebie,
@@ -287,17 +307,15 @@ async def update_order_items(
         # Update order total
         supabase.table("orders").update({"total_amount": total_amount}).eq("id", order_id).execute()
 
-        # Update wallet balance if there's a difference
+        # Record the adjustment if there's a difference; insert-only -
+        # the migration 016 triggers stamp balance_after and keep
+        # distributors.wallet_balance in sync
         if amount_delta != 0:
-            supabase.table("distributors").update({"wallet_balance": new_balance}).eq("id", order.data["distributor_id"]).execute()
-
-            # Record wallet transaction for the adjustment
             supabase.table("wallet_transactions").insert({
                 "distributor_id": order.data["distributor_id"],
                 "date": datetime.utcnow().isoformat(),
                 "type": "ORDER_PAYMENT",
                 "amount": -amount_delta,
-                "balance_after": new_balance,
                 "order_id": order_id,
                 "initiated_by": current_user.email,
                 "remarks": "Order Edit Adjustment"
@@ -335,19 +353,15 @@ async def update_order_status(
             order_items = supabase.table("order_items").select("*").eq("order_id", order_id).execute()
             
             for item in order_items.data:
-                existing_stock = supabase.table("stock_items").select("quantity, reserved").eq("location_id", PLANT_LOCATION_ID).eq("sku_id", item["sku_id"]).single().execute()
-                
-                if existing_stock.data:
-                    current_qty = existing_stock.data["quantity"]
-                    current_reserved = existing_stock.data["reserved"]
-                    
-                    new_qty = current_qty - item["quantity"]
-                    new_reserved = current_reserved - item["quantity"]
-                    
-                    supabase.table("stock_items").update({
-                        "quantity": new_qty, 
-                        "reserved": new_reserved
-                    }).eq("location_id", PLANT_LOCATION_ID).eq("sku_id", item["sku_id"]).execute()
+                # Apply the delta in one UPDATE ... RETURNING round trip
+                # instead of a read followed by an absolute write
+                # (see migration 013)
+                supabase.rpc("adjust_stock_item", {
+                    "p_location_id": PLANT_LOCATION_ID,
+                    "p_sku_id": item["sku_id"],
+                    "p_quantity_delta": -item["quantity"],
+                    "p_reserved_delta": -item["quantity"]
+                }).execute()
 
         response = supabase.table("orders").update(update_data).eq("id", order_id).execute()
 
@@ -383,27 +397,24 @@ async def delete_order(
         if order.data["status"] == OrderStatus.PENDING.value:
              order_items = supabase.table("order_items").select("*").eq("order_id", order_id).execute()
              for item in order_items.data:
-                 existing_stock = supabase.table("stock_items").select("reserved").eq("location_id", PLANT_LOCATION_ID).eq("sku_id", item["sku_id"]).single().execute()
-                 if existing_stock.data:
-                     new_reserved = existing_stock.data["reserved"] - item["quantity"]
-                     # Prevent negative reserved (just in case)
-                     if new_reserved < 0: new_reserved = 0
-                     supabase.table("stock_items").update({"reserved": new_reserved}).eq("location_id", PLANT_LOCATION_ID).eq("sku_id", item["sku_id"]).execute()
-
-        # Refund wallet if payment was made
+                 # One relative UPDATE per SKU; the function clamps reserved
+                 # at zero (see migration 013)
+                 supabase.rpc("adjust_stock_item", {
+                     "p_location_id": PLANT_LOCATION_ID,
+                     "p_sku_id": item["sku_id"],
+                     "p_quantity_delta": 0,
+                     "p_reserved_delta": -item["quantity"]
+                 }).execute()
+
+        # Refund wallet if payment was made: insert-only - the migration
+        # 016 triggers stamp balance_after and keep
+        # distributors.wallet_balance in sync
         if order.data["status"] == OrderStatus.PENDING.value:
-            distributor = supabase.table("distributors").select("wallet_balance").eq("id", order.data["distributor_id"]).single().execute()
-            new_balance = distributor.data["wallet_balance"] + order.data["total_amount"]
-
-            supabase.table("distributors").update({"wallet_balance": new_balance}).eq("id", order.data["distributor_id"]).execute()
-
-            # Record refund transaction
             supabase.table("wallet_transactions").insert({
                 "distributor_id": order.data["distributor_id"],
                 "date": datetime.utcnow().isoformat(),
                 "type": "ORDER_REFUND",
                 "amount": order.data["total_amount"],
-                "balance_after": new_balance,
                 "order_id": order_id,
                 "initiated_by": current_user.email,
                 "remarks": remarks
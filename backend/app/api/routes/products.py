@@ -3,6 +3,7 @@ from app.core.auth import get_current_user, CurrentUser
 from typing import List
 from app.models import SKU, SKUCreate, Scheme, SchemeCreate, PriceTier, PriceTierCreate, PriceTierItem
 from app.core.supabase import get_supabase_client
+from app.core.cache import evict_sku
 from supabase import Client
 from app.services.audit import log_product_created, log_product_updated, log_scheme_created
 
@@ -57,7 +58,10 @@ async def update_sku(
         response = supabase.table("skus").update(sku.model_dump()).eq("id", sku_id).execute()
         if not response.data:
             raise HTTPException(status_code=404, detail="SKU not found")
-        
+
+        # Invalidate cached lookup data for this SKU
+        evict_sku(sku_id)
+
         # Audit log
         await log_product_updated(
             product_id=sku_id,
@@ -79,6 +83,7 @@ async def delete_sku(
     """Delete a SKU"""
     try:
         response = supabase.table("skus").delete().eq("id", sku_id).execute()
+        evict_sku(sku_id)
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
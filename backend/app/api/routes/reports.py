@@ -1,18 +1,50 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional
-from app.core.supabase import get_supabase_client
-from supabase import Client
+from app.core.supabase import get_supabase_async_client, get_supabase_async_admin_client
+from app.core.loaders import BatchLoader
+from app.core.cache import sku_carton_size_cache
+from supabase import AsyncClient
 from datetime import datetime
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
 
-@router.get("/customer-statement/{distributor_id}")
+async def _load_returns(return_ids):
+    """Batch fetch of order_returns rows for all concurrent statement requests"""
+    supabase = await get_supabase_async_client()
+    response = await supabase.table("order_returns").select("id, items").in_("id", list(return_ids)).execute()
+    return {row["id"]: row for row in (response.data or [])}
+
+
+async def _load_sku_carton_sizes(sku_ids):
+    """Batch fetch of SKU carton sizes for all concurrent statement requests"""
+    # Serve hot SKUs from the in-process TTL cache and only query the rest
+    sizes = {i: sku_carton_size_cache[i] for i in sku_ids if i in sku_carton_size_cache}
+    missing = [i for i in sku_ids if i not in sizes]
+    if missing:
+        supabase = await get_supabase_async_client()
+        response = await supabase.table("skus").select("id, carton_size").in_("id", missing).execute()
+        for row in (response.data or []):
+            size = row.get("carton_size", 0)
+            sku_carton_size_cache[row["id"]] = size
+            sizes[row["id"]] = size
+    return sizes
+
+
+# Shared across requests so concurrent statements coalesce into one query each
+_return_loader = BatchLoader(_load_returns)
+_sku_size_loader = BatchLoader(_load_sku_carton_sizes)
+
+
+# Statements can run to thousands of rows; orjson serializes the large
+# payload several times faster than the default json encoder
+@router.get("/customer-statement/{distributor_id}", response_class=ORJSONResponse)
 async def get_customer_statement(
     distributor_id: str,
     start_date: str = Query(...),
     end_date: str = Query(...),
-    supabase: Client = Depends(get_supabase_client)
+    supabase: AsyncClient = Depends(get_supabase_async_client)
 ):
     """
     Get customer statement for a distributor between date range
@@ -20,7 +52,7 @@ async def get_customer_statement(
     """
     try:
         # Get distributor details
-        dist_response = supabase.table("distributors").select("*").eq("id", distributor_id).single().execute()
+        dist_response = await supabase.table("distributors").select("*").eq("id", distributor_id).single().execute()
         if not dist_response.data:
             raise HTTPException(status_code=404, detail="Distributor not found")
 
@@ -30,9 +62,8 @@ async def get_customer_statement(
         company_name = "GENERIC DAIRY PLANT"
         company_city = "Hyderabad"
         try:
-            from app.core.supabase import get_supabase_admin_client
-            admin_supabase = get_supabase_admin_client()
-            company_response = admin_supabase.table("companies").select("*").order("created_at", desc=True).limit(1).execute()
+            admin_supabase = await get_supabase_async_admin_client()
+            company_response = await admin_supabase.table("companies").select("*").order("created_at", desc=True).limit(1).execute()
             
             print(f"[DEBUG] Companies query response: {company_response.data}")
             
@@ -49,29 +80,48 @@ async def get_customer_statement(
             traceback.print_exc()
 
 
-        # Get all orders in date range with items
-        orders_response = supabase.table("orders").select(
-            "id, date, total_amount, shipment_size, order_items(sku_id, quantity)"
-        ).eq("distributor_id", distributor_id).gte("date", start_date).lte("date", end_date).order("date").execute()
-        orders = orders_response.data or []
+        # Fetch orders, transactions and opening balance in one RPC round trip
+        # (see migration 008_customer_statement_rpc.sql)
+        orders = None
+        transactions = []
+        opening_balance = 0.0
+        try:
+            rpc_response = await supabase.rpc("get_customer_statement_data", {
+                "p_distributor_id": distributor_id,
+                "p_start_date": start_date,
+                "p_end_date": end_date
+            }).execute()
+            if rpc_response.data:
+                orders = rpc_response.data.get("orders") or []
+                transactions = rpc_response.data.get("transactions") or []
+                opening_balance = rpc_response.data.get("opening_balance") or 0.0
+        except Exception as e:
+            print(f"[WARNING] Statement RPC unavailable, falling back to separate queries: {e}")
 
-        # Get all wallet transactions in date range
-        transactions_response = supabase.table("wallet_transactions").select("*").eq("distributor_id", distributor_id).gte("date", start_date).lte("date", end_date).order("date").execute()
-        transactions = transactions_response.data or []
+        if orders is None:
+            # Fallback: three separate ordered queries
+            orders_response = await supabase.table("orders").select(
+                "id, date, total_amount, shipment_size, order_items(sku_id, quantity)"
+            ).eq("distributor_id", distributor_id).gte("date", start_date).lte("date", end_date).order("date").execute()
+            orders = orders_response.data or []
 
-        # Calculate opening balance (balance before start_date)
-        opening_txn_response = supabase.table("wallet_transactions").select("balance_after").eq("distributor_id", distributor_id).lt("date", start_date).order("date", desc=True).limit(1).execute()
+            # Get all wallet transactions in date range
+            transactions_response = await supabase.table("wallet_transactions").select("*").eq("distributor_id", distributor_id).gte("date", start_date).lte("date", end_date).order("date").execute()
+            transactions = transactions_response.data or []
 
-        opening_balance = 0.0
-        if opening_txn_response.data and len(opening_txn_response.data) > 0:
-            opening_balance = opening_txn_response.data[0]["balance_after"]
+            # Calculate opening balance (balance before start_date)
+            opening_txn_response = await supabase.table("wallet_transactions").select("balance_after").eq("distributor_id", distributor_id).lt("date", start_date).order("date", desc=True).limit(1).execute()
+
+            if opening_txn_response.data and len(opening_txn_response.data) > 0:
+                opening_balance = opening_txn_response.data[0]["balance_after"]
 
         # Create individual transaction rows (not grouped by date)
         all_rows = []
 
         # Add order rows - each order is a separate row
         for order in orders:
-
+            order_date = order["date"]
+            order_day = order_date[:10]  # YYYY-MM-DD slice computed once
             shipment_size = order.get("shipment_size", 0)
             
             # Format product summary
@@ -89,8 +139,8 @@ async def get_customer_statement(
                 particulars += f" - {product_summary}"
 
             all_rows.append({
-                "datetime": order["date"],  # Full datetime for sorting
-                "date": order["date"][:10],  # YYYY-MM-DD for display
+                "datetime": order_date,  # Full datetime for sorting
+                "date": order_day,  # YYYY-MM-DD for display
                 "particulars": particulars,  # Show order number + items
                 "sale_amount": order["total_amount"],
                 "collection": 0.0,
@@ -111,25 +161,28 @@ async def get_customer_statement(
                     return_ids.append(match.group(1))
 
         # Fetch return details and SKU sizes if needed
+        # Loads go through shared batch loaders so concurrent statement
+        # requests fold into a single order_returns / skus query
         return_sizes = {}
         if return_ids:
             try:
-                returns_resp = supabase.table("order_returns").select("id, items").in_("id", return_ids).execute()
-                returns_data = returns_resp.data or []
-                
+                return_rows = await _return_loader.load_many(return_ids)
+                returns_data = [row for row in return_rows if row]
+
                 # Get all SKU IDs
                 sku_ids = set()
                 for ret in returns_data:
                     if ret.get("items"):
                         for item in ret["items"]:
                             sku_ids.add(item["skuId"])
-                
+
                 # Fetch SKU carton sizes
                 sku_map = {}
                 if sku_ids:
-                    skus_resp = supabase.table("skus").select("id, carton_size").in_("id", list(sku_ids)).execute()
-                    sku_map = {s["id"]: s.get("carton_size", 0) for s in skus_resp.data}
-                
+                    sku_id_list = list(sku_ids)
+                    sizes = await _sku_size_loader.load_many(sku_id_list)
+                    sku_map = {i: s for i, s in zip(sku_id_list, sizes) if s is not None}
+
                 # Calculate size for each return
                 for ret in returns_data:
                     size = 0.0
@@ -142,11 +195,13 @@ async def get_customer_statement(
 
         # Add transaction rows - recharges and journal vouchers
         for txn in transactions:
+            txn_date = txn["date"]
+            txn_day = txn_date[:10]  # YYYY-MM-DD slice computed once
             if txn["type"] == "RECHARGE":
                 payment_method = txn.get("payment_method", "Unknown")
                 all_rows.append({
-                    "datetime": txn["date"],  # Full datetime for sorting
-                    "date": txn["date"][:10],  # YYYY-MM-DD for display
+                    "datetime": txn_date,  # Full datetime for sorting
+                    "date": txn_day,  # YYYY-MM-DD for display
                     "particulars": f"Recharge ({payment_method})",
                     "sale_amount": 0.0,
                     "collection": txn["amount"],
@@ -156,8 +211,8 @@ async def get_customer_statement(
                 })
             elif txn["type"] == "JOURNAL_VOUCHER":
                 all_rows.append({
-                    "datetime": txn["date"],
-                    "date": txn["date"][:10],
+                    "datetime": txn_date,
+                    "date": txn_day,
                     "particulars": f"JV: {txn.get('remarks', 'Adjustment')}",
                     "sale_amount": 0.0,
                     "collection": 0.0,
@@ -175,8 +230,8 @@ async def get_customer_statement(
                      shipment_size = -return_sizes[match.group(1)]  # Negative for returns
                      
                  all_rows.append({
-                    "datetime": txn["date"],
-                    "date": txn["date"][:10],
+                    "datetime": txn_date,
+                    "date": txn_day,
                     "particulars": f"Return Credit: {order_ref}{txn.get('remarks', '')}",
                     "sale_amount": 0.0,
                     "collection": 0.0,
@@ -187,8 +242,8 @@ async def get_customer_statement(
             elif txn["type"] == "ORDER_REFUND":
                  order_ref = f"Order #{txn['order_id']} " if txn.get('order_id') else ""
                  all_rows.append({
-                    "datetime": txn["date"],
-                    "date": txn["date"][:10],
+                    "datetime": txn_date,
+                    "date": txn_day,
                     "particulars": f"Order Refund: {order_ref}{txn.get('remarks', '')}",
                     "sale_amount": 0.0,
                     "collection": 0.0,
@@ -3,6 +3,8 @@ Returns Management Routes
 Handles product returns, refunds, and credit notes.
 """
 
+import asyncio
+
 from fastapi import APIRouter, HTTPException, Depends, Query, status
 from app.core.auth import get_current_user, CurrentUser
 from typing import List, Optional
@@ -143,23 +145,22 @@ async def approve_return(
         
         distributor_id = return_record.data["distributor_id"]
         
-        # Credit distributor wallet
-        distributor = supabase.table("distributors").select("wallet_balance").eq("id", distributor_id).single().execute()
-        new_balance = distributor.data["wallet_balance"] + confirm_data.creditAmount
-        
-        supabase.table("distributors").update({"wallet_balance": new_balance}).eq("id", distributor_id).execute()
-        
-        # Record wallet transaction
+        # Credit distributor wallet: insert-only - the migration 016
+        # triggers stamp balance_after and keep
+        # distributors.wallet_balance in sync
         supabase.table("wallet_transactions").insert({
             "distributor_id": distributor_id,
             "date": datetime.utcnow().isoformat(),
             "type": "RETURN_CREDIT",
             "amount": confirm_data.creditAmount,
-            "balance_after": new_balance,
             "remarks": f"Return credit for return #{return_id}",
             "initiated_by": current_user.email
         }).execute()
-        
+
+        # Re-read the trigger-maintained balance for the response
+        distributor = supabase.table("distributors").select("wallet_balance").eq("id", distributor_id).single().execute()
+        new_balance = distributor.data["wallet_balance"]
+
         # Update return status
         supabase.table("returns").update({
             "status": ReturnStatus.CREDITED.value,
@@ -169,14 +170,14 @@ async def approve_return(
             "approval_remarks": confirm_data.remarks
         }).eq("id", return_id).execute()
         
-        # Audit log
-        await log_return_confirmed(
+        # Audit log - fire-and-forget so the response isn't held up by it
+        asyncio.create_task(log_return_confirmed(
             return_id=return_id,
             user_id=current_user.id,
             username=current_user.email,
             amount=confirm_data.creditAmount
-        )
-        
+        ))
+
         return {"message": "Return approved and credited", "newBalance": new_balance}
         
     except HTTPException:
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, status, Response
+import hashlib
+
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status, Response
 from typing import List, Optional
 from app.models import (
     StockItem, StockProduction, StockTransfer, StockTransferCreate, StockTransferStatus
 )
 from app.core.auth import get_current_user, CurrentUser
-from app.core.supabase import get_supabase_client
-from supabase import Client
-from datetime import datetime
+from app.core.config import PLANT_LOCATION_ID
+from app.core.supabase import get_supabase_async_client
+from app.core.cache import sku_price_cache, store_name_cache
+from supabase import AsyncClient
 from app.services.audit import log_stock_production, log_transfer_created, log_transfer_delivered
 from app.services.stock_alerts import StockAlertService
 
@@ -15,8 +19,10 @@ router = APIRouter(prefix="/stock", tags=["Stock Management"])
 
 @router.get("", response_model=List[StockItem])
 async def get_stock(
+    request: Request,
+    http_response: Response,
     location_id: Optional[str] = Query(None),
-    supabase: Client = Depends(get_supabase_client)
+    supabase: AsyncClient = Depends(get_supabase_async_client)
 ):
     """
     Get stock items for a specific location (plant or store)
@@ -27,8 +33,17 @@ async def get_stock(
         if location_id:
             query = query.eq("locationId", location_id)
 
-        response = query.execute()
-        return response.data
+        response = await query.execute()
+        data = response.data
+
+        # HTTP-level caching: a client revalidating with If-None-Match gets
+        # a bodyless 304 when the stock payload is unchanged
+        etag = f'"{hashlib.md5(orjson.dumps(data)).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        http_response.headers["ETag"] = etag
+
+        return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -37,52 +52,56 @@ async def get_stock(
 async def add_production(
     production: StockProduction,
     current_user: CurrentUser = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client)
+    supabase: AsyncClient = Depends(get_supabase_async_client)
 ):
     """
     Add production stock to plant
     """
     try:
-        PLANT_LOCATION_ID = "00000000-0000-0000-0000-000000000000"
-
+        # Fetch all affected plant stock rows in one query
+        sku_ids = [item.sku_id for item in production.items]
+        existing = await supabase.table("stock").select("skuId, quantity, reserved").eq("locationId", PLANT_LOCATION_ID).in_("skuId", sku_ids).execute()
+        existing_map = {row["skuId"]: row for row in (existing.data or [])}
+
+        # Build the new stock state and ledger entries in memory
+        # (date is stamped by the DB default, see migration 014)
+        stock_rows = []
+        ledger_rows = []
         for item in production.items:
-            sku_id = item["skuId"]
-            quantity = item["quantity"]
-
-            # Check if stock exists
-            existing = supabase.table("stock").select("*").eq("locationId", PLANT_LOCATION_ID).eq("skuId", sku_id).execute()
-
-            if existing.data:
-                # Update existing stock
-                new_qty = existing.data[0]["quantity"] + quantity
-                supabase.table("stock").update({"quantity": new_qty}).eq("locationId", PLANT_LOCATION_ID).eq("skuId", sku_id).execute()
-            else:
-                # Insert new stock
-                supabase.table("stock").insert({
-                    "locationId": PLANT_LOCATION_ID,
-                    "skuId": sku_id,
-                    "quantity": quantity,
-                    "reserved": 0
-                }).execute()
-
-            # Record in ledger
-            supabase.table("stock_ledger").insert({
-                "date": datetime.utcnow().isoformat(),
+            sku_id = item.sku_id
+            quantity = item.quantity
+            current = existing_map.get(sku_id)
+            new_qty = (current["quantity"] if current else 0) + quantity
+
+            stock_rows.append({
+                "locationId": PLANT_LOCATION_ID,
+                "skuId": sku_id,
+                "quantity": new_qty,
+                "reserved": current["reserved"] if current else 0
+            })
+            ledger_rows.append({
                 "skuId": sku_id,
                 "quantityChange": quantity,
-                "balanceAfter": new_qty if existing.data else quantity,
+                "balanceAfter": new_qty,
                 "type": "PRODUCTION",
+                # type + initiatedBy already encode what notes used to
+                # spell out per row
                 "locationId": PLANT_LOCATION_ID,
-                "notes": f"Production added by {current_user.email}",
                 "initiatedBy": current_user.email
-            }).execute()
-            
-            # Audit log for each item
+            })
+
+        # One upsert for all stock rows (insert-or-update on locationId+skuId,
+        # see migration 009) and one insert for all ledger rows
+        await supabase.table("stock").upsert(stock_rows, on_conflict="locationId,skuId").execute()
+        await supabase.table("stock_ledger").insert(ledger_rows).execute()
+
+        # Audit log for each item
+        for item in production.items:
             await log_stock_production(
-                sku_id=sku_id,
+                sku_id=item.sku_id,
                 user_id=current_user.id,
                 username=current_user.email,
-                quantity=quantity,
+                quantity=item.quantity,
                 location="Plant"
             )
 
@@ -95,61 +114,71 @@ async def add_production(
 async def create_stock_transfer(
     transfer: StockTransferCreate,
     current_user: CurrentUser = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client)
+    supabase: AsyncClient = Depends(get_supabase_async_client)
 ):
     """
     Create a stock transfer from plant to store
     """
     try:
-        PLANT_LOCATION_ID = "00000000-0000-0000-0000-000000000000"
         total_value = 0.0
 
-        # Validate stock availability
-        for item in transfer.items:
-            stock = supabase.table("stock").select("*").eq("locationId", PLANT_LOCATION_ID).eq("skuId", item["skuId"]).single().execute()
-
-            if not stock.data or (stock.data["quantity"] - stock.data["reserved"]) < item["quantity"]:
-                raise HTTPException(status_code=400, detail=f"Insufficient stock for SKU {item['skuId']}")
-
-            # Get SKU price
-            sku = supabase.table("skus").select("price").eq("id", item["skuId"]).single().execute()
-            total_value += sku.data["price"] * item["quantity"]
+        # Validate availability and reserve stock atomically in one RPC
+        # (see migration 010) - concurrent transfers can no longer both
+        # reserve the same units
+        try:
+            await supabase.rpc("reserve_transfer_stock", {
+                "p_location_id": PLANT_LOCATION_ID,
+                "p_items": [item.model_dump(by_alias=True) for item in transfer.items]
+            }).execute()
+        except Exception as e:
+            if "Insufficient stock" in str(e):
+                raise HTTPException(status_code=400, detail=str(e))
+            raise
+
+        # Resolve SKU prices from the TTL cache, fetching only misses
+        sku_ids = [item.sku_id for item in transfer.items]
+        price_map = {i: sku_price_cache[i] for i in sku_ids if i in sku_price_cache}
+        missing = [i for i in sku_ids if i not in price_map]
+        if missing:
+            skus_response = await supabase.table("skus").select("id, price").in_("id", missing).execute()
+            for row in (skus_response.data or []):
+                price_map[row["id"]] = row["price"]
+                sku_price_cache[row["id"]] = row["price"]
+        total_value = sum(price_map.get(item.sku_id, 0) * item.quantity for item in transfer.items)
 
         # Create transfer
+        # date comes from the DB default (migration 014) and is returned
+        # with the inserted row
         transfer_obj = {
-            "destinationStoreId": transfer.storeId,
-            "date": datetime.utcnow().isoformat(),
+            "destinationStoreId": transfer.store_id,
             "status": StockTransferStatus.PENDING.value,
             "initiatedBy": current_user.email,
             "totalValue": total_value
         }
 
-        transfer_response = supabase.table("stock_transfers").insert(transfer_obj).execute()
+        transfer_response = await supabase.table("stock_transfers").insert(transfer_obj).execute()
         if not transfer_response.data:
             raise HTTPException(status_code=400, detail="Failed to create transfer")
 
         transfer_id = transfer_response.data[0]["id"]
 
-        # Insert transfer items and reserve stock
-        for item in transfer.items:
-            sku = supabase.table("skus").select("price").eq("id", item["skuId"]).single().execute()
-
-            supabase.table("stock_transfer_items").insert({
-                "transferId": transfer_id,
-                "skuId": item["skuId"],
-                "quantity": item["quantity"],
-                "unitPrice": sku.data["price"],
-                "isFreebie": False
-            }).execute()
-
-            # Reserve stock
-            stock = supabase.table("stock").select("*").eq("locationId", PLANT_LOCATION_ID).eq("skuId", item["skuId"]).single().execute()
-            new_reserved = stock.data["reserved"] + item["quantity"]
-            supabase.table("stock").update({"reserved": new_reserved}).eq("locationId", PLANT_LOCATION_ID).eq("skuId", item["skuId"]).execute()
-
-        # Get store name for audit
-        store_info = supabase.table("stores").select("name").eq("id", transfer.storeId).execute()
-        store_name = store_info.data[0]["name"] if store_info.data else "Unknown Store"
+        # Insert all transfer items in one statement (stock was already
+        # reserved by the RPC and prices fetched above)
+        item_rows = [{
+            "transferId": transfer_id,
+            "skuId": item.sku_id,
+            "quantity": item.quantity,
+            "unitPrice": price_map.get(item.sku_id, 0),
+            "isFreebie": False
+        } for item in transfer.items]
+        await supabase.table("stock_transfer_items").insert(item_rows).execute()
+
+        # Get store name for audit (cached - store renames are rare)
+        store_name = store_name_cache.get(transfer.store_id)
+        if store_name is None:
+            store_info = await supabase.table("stores").select("name").eq("id", transfer.store_id).execute()
+            store_name = store_info.data[0]["name"] if store_info.data else "Unknown Store"
+            store_name_cache[transfer.store_id] = store_name
         
         # Audit log
         await log_transfer_created(
@@ -162,6 +191,8 @@ async def create_stock_transfer(
 
         return transfer_response.data[0]
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -170,20 +201,32 @@ async def create_stock_transfer(
 async def get_stock_transfers(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    supabase: Client = Depends(get_supabase_client)
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="date of the last row of the previous page"),
+    supabase: AsyncClient = Depends(get_supabase_async_client)
 ):
     """
-    Get all stock transfers, optionally filtered by date range
+    Get stock transfers, optionally filtered by date range.
+
+    Pass limit together with the date of the last received row as cursor
+    to page through large histories (keyset pagination on the indexed
+    date column, see migration 012) instead of fetching everything.
     """
     try:
         query = supabase.table("stock_transfers").select("*, stores(name)")
-        
+
         if start_date:
             query = query.gte("date", start_date)
         if end_date:
             query = query.lte("date", end_date)
-            
-        response = query.order("date", desc=True).execute()
+        if cursor:
+            query = query.lt("date", cursor)
+
+        query = query.order("date", desc=True)
+        if limit:
+            query = query.limit(limit)
+
+        response = await query.execute()
         return response.data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -194,50 +237,22 @@ async def update_transfer_status(
     transfer_id: str,
     status: StockTransferStatus,
     current_user: CurrentUser = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client)
+    supabase: AsyncClient = Depends(get_supabase_async_client)
 ):
     """
     Update stock transfer status (mark as delivered)
     """
     try:
-        PLANT_LOCATION_ID = "00000000-0000-0000-0000-000000000000"
-
         if status == StockTransferStatus.DELIVERED:
-            # Get transfer details
-            transfer = supabase.table("stock_transfers").select("*").eq("id", transfer_id).single().execute()
-            if not transfer.data:
-                raise HTTPException(status_code=404, detail="Transfer not found")
-
-            # Get transfer items
-            items = supabase.table("stock_transfer_items").select("*").eq("transferId", transfer_id).execute()
-
-            for item in items.data:
-                # Deduct from plant stock
-                plant_stock = supabase.table("stock").select("*").eq("locationId", PLANT_LOCATION_ID).eq("skuId", item["skuId"]).single().execute()
-                new_qty = plant_stock.data["quantity"] - item["quantity"]
-                new_reserved = plant_stock.data["reserved"] - item["quantity"]
-                supabase.table("stock").update({"quantity": new_qty, "reserved": new_reserved}).eq("locationId", PLANT_LOCATION_ID).eq("skuId", item["skuId"]).execute()
-
-                # Add to store stock
-                store_stock = supabase.table("stock").select("*").eq("locationId", transfer.data["destinationStoreId"]).eq("skuId", item["skuId"]).execute()
-
-                if store_stock.data:
-                    new_store_qty = store_stock.data[0]["quantity"] + item["quantity"]
-                    supabase.table("stock").update({"quantity": new_store_qty}).eq("locationId", transfer.data["destinationStoreId"]).eq("skuId", item["skuId"]).execute()
-                else:
-                    supabase.table("stock").insert({
-                        "locationId": transfer.data["destinationStoreId"],
-                        "skuId": item["skuId"],
-                        "quantity": item["quantity"],
-                        "reserved": 0
-                    }).execute()
-
-            # Update transfer status
-            supabase.table("stock_transfers").update({
-                "status": status.value,
-                "deliveredDate": datetime.utcnow().isoformat()
-            }).eq("id", transfer_id).execute()
-            
+            # Move stock from plant to store and mark the transfer delivered
+            # in one atomic RPC (see migration 011)
+            try:
+                await supabase.rpc("deliver_stock_transfer", {"p_transfer_id": transfer_id}).execute()
+            except Exception as e:
+                if "not found" in str(e):
+                    raise HTTPException(status_code=404, detail="Transfer not found")
+                raise
+
             # Audit log
             await log_transfer_delivered(
                 transfer_id=transfer_id,
@@ -246,6 +261,8 @@ async def update_transfer_status(
             )
 
         return {"message": "Transfer status updated successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
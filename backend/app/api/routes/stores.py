@@ -1,20 +1,38 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Response
+import hashlib
+
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Request, status, Response
+from fastapi.concurrency import run_in_threadpool
 from app.core.auth import get_current_user, CurrentUser
 from typing import List
 from app.models import Store, StoreCreate, PortalState
 from app.core.supabase import get_supabase_client
 from supabase import Client
+from app.services import store_cache
 from app.services.audit import log_store_created, log_store_updated
 
 router = APIRouter(prefix="/stores", tags=["Stores"])
 
 
 @router.get("", response_model=List[Store])
-async def get_stores(supabase: Client = Depends(get_supabase_client)):
+async def get_stores(
+    request: Request,
+    http_response: Response,
+    supabase: Client = Depends(get_supabase_client)
+):
     """Get all stores"""
     try:
-        response = supabase.table("stores").select("*").execute()
-        return response.data
+        # Served from the process-level TTL cache between writes
+        data = await store_cache.get_all(supabase)
+
+        # HTTP-level caching: a client revalidating with If-None-Match gets
+        # a bodyless 304 when the store list is unchanged
+        etag = f'"{hashlib.md5(orjson.dumps(data)).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        http_response.headers["ETag"] = etag
+
+        return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -26,10 +44,10 @@ async def get_store_by_id(
 ):
     """Get store by ID"""
     try:
-        response = supabase.table("stores").select("*").eq("id", store_id).single().execute()
-        if not response.data:
+        data = await store_cache.get_by_id(supabase, store_id)
+        if not data:
             raise HTTPException(status_code=404, detail="Store not found")
-        return response.data
+        return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -45,10 +63,12 @@ async def create_store(
         data = store.model_dump()
         data["walletBalance"] = 0.0
 
-        response = supabase.table("stores").insert(data).execute()
+        response = await run_in_threadpool(supabase.table("stores").insert(data).execute)
         if not response.data:
             raise HTTPException(status_code=400, detail="Failed to create store")
-        
+
+        store_cache.invalidate_all()
+
         # Audit log
         await log_store_created(
             store_id=response.data[0]["id"],
@@ -71,10 +91,13 @@ async def update_store(
 ):
     """Update store information"""
     try:
-        response = supabase.table("stores").update(store.model_dump()).eq("id", store_id).execute()
+        response = await run_in_threadpool(supabase.table("stores").update(store.model_dump()).eq("id", store_id).execute)
         if not response.data:
             raise HTTPException(status_code=404, detail="Store not found")
-        
+
+        # Invalidate cached lookup data for this store
+        store_cache.invalidate(store_id)
+
         # Audit log
         await log_store_updated(
             store_id=store_id,
@@ -95,7 +118,8 @@ async def delete_store(
 ):
     """Delete a store"""
     try:
-        response = supabase.table("stores").delete().eq("id", store_id).execute()
+        response = await run_in_threadpool(supabase.table("stores").delete().eq("id", store_id).execute)
+        store_cache.invalidate(store_id)
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,12 +1,17 @@
+import logging
+
 from fastapi import APIRouter, HTTPException, Depends, status, Response
-from app.core.auth import get_current_user, CurrentUser
-from pydantic import BaseModel, EmailStr
+from fastapi.concurrency import run_in_threadpool
+from app.core.auth import get_current_user, evict_profile, CurrentUser
+from pydantic import BaseModel
 from typing import Optional, List
 from app.core.supabase import get_supabase_admin_client
 from supabase import Client
 from gotrue.errors import AuthApiError
 from app.services.audit import log_user_created, log_user_updated, log_user_deleted
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
@@ -49,7 +54,7 @@ async def create_user(
     """
     try:
         # Create user in Supabase Auth using admin API
-        auth_response = supabase.auth.admin.create_user({
+        auth_response = await run_in_threadpool(supabase.auth.admin.create_user, {
             "email": user_data.username,
             "password": user_data.password,
             "email_confirm": True  # Auto-confirm email
@@ -70,19 +75,30 @@ async def create_user(
             "asm_id": user_data.asmId
         }
         
-        profile_response = supabase.table("users").update(profile_data).eq("id", user_id).execute()
+        profile_response = await run_in_threadpool(supabase.table("users").update(profile_data).eq("id", user_id).execute)
         
         if not profile_response.data:
             # If update failed, try insert (in case trigger didn't create row)
             profile_data["id"] = user_id
-            profile_response = supabase.table("users").insert(profile_data).execute()
+            profile_response = await run_in_threadpool(supabase.table("users").insert(profile_data).execute)
         
         user = profile_response.data[0] if profile_response.data else None
         
         if not user:
             raise HTTPException(status_code=400, detail="Failed to create user profile")
         
-        return UserResponse(
+        # Audit log (was unreachable below the return; the queue-based
+        # logger makes this a cheap enqueue, not a DB round-trip)
+        await log_user_created(
+            new_user_id=user["id"],
+            admin_id=current_user.id,
+            admin_username=current_user.email,
+            user_data={"username": user_data.username, "role": user_data.role}
+        )
+
+        # model_construct skips validation - these fields come from our
+        # own users table, not from the client
+        return UserResponse.model_construct(
             id=user["id"],
             username=user["username"],
             role=user["role"],
@@ -90,15 +106,7 @@ async def create_user(
             permissions=user.get("permissions", []),
             asmId=user.get("asm_id")
         )
-        
-        # Audit log
-        await log_user_created(
-            new_user_id=user["id"],
-            admin_id=current_user.id,
-            admin_username=current_user.email,
-            user_data={"username": user_data.username, "role": user_data.role}
-        )
-        
+
     except AuthApiError as e:
         error_msg = str(e)
         if "already been registered" in error_msg.lower() or "already exists" in error_msg.lower():
@@ -107,7 +115,7 @@ async def create_user(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error creating user: {e}")
+        logger.exception("create_user failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -123,22 +131,19 @@ async def update_user(
     Uses admin API so any user's password can be changed.
     """
     try:
-        # Update password if provided (using admin API)
+        # Update password and/or email in auth with one admin call
+        auth_patch = {}
         if user_data.password:
-            supabase.auth.admin.update_user_by_id(
-                user_id,
-                {"password": user_data.password}
-            )
-        
+            auth_patch["password"] = user_data.password
+        if user_data.username is not None:
+            auth_patch["email"] = user_data.username
+        if auth_patch:
+            await run_in_threadpool(supabase.auth.admin.update_user_by_id, user_id, auth_patch)
+
         # Build profile update data (only include non-None fields)
         profile_update = {}
         if user_data.username is not None:
             profile_update["username"] = user_data.username
-            # Also update email in auth if username changed
-            supabase.auth.admin.update_user_by_id(
-                user_id,
-                {"email": user_data.username}
-            )
         if user_data.role is not None:
             profile_update["role"] = user_data.role
         if user_data.storeId is not None:
@@ -150,16 +155,17 @@ async def update_user(
         
         # Update profile in users table if there are changes
         if profile_update:
-            response = supabase.table("users").update(profile_update).eq("id", user_id).execute()
+            response = await run_in_threadpool(supabase.table("users").update(profile_update).eq("id", user_id).execute)
         else:
             # Just fetch current data if only password was updated
-            response = supabase.table("users").select("*").eq("id", user_id).execute()
+            response = await run_in_threadpool(supabase.table("users").select("*").eq("id", user_id).execute)
         
         if not response.data:
             raise HTTPException(status_code=404, detail="User not found")
         
         user = response.data[0]
-        
+        evict_profile(user_id)
+
         # Audit log
         await log_user_updated(
             user_id=user_id,
@@ -168,7 +174,9 @@ async def update_user(
             changes=profile_update
         )
         
-        return UserResponse(
+        # model_construct skips validation - these fields come from our
+        # own users table, not from the client
+        return UserResponse.model_construct(
             id=user["id"],
             username=user["username"],
             role=user["role"],
@@ -182,7 +190,7 @@ async def update_user(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error updating user: {e}")
+        logger.exception("update_user failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -198,14 +206,15 @@ async def delete_user(
     """
     try:
         # First get user info before deleting
-        user_info = supabase.table("users").select("username").eq("id", user_id).execute()
+        user_info = await run_in_threadpool(supabase.table("users").select("username").eq("id", user_id).execute)
         deleted_username = user_info.data[0]["username"] if user_info.data else "unknown"
         
         # Delete from public.users table
-        supabase.table("users").delete().eq("id", user_id).execute()
+        await run_in_threadpool(supabase.table("users").delete().eq("id", user_id).execute)
         
         # Then delete from auth.users using admin API
-        supabase.auth.admin.delete_user(user_id)
+        await run_in_threadpool(supabase.auth.admin.delete_user, user_id)
+        evict_profile(user_id)
         
         # Audit log
         await log_user_deleted(
@@ -219,8 +228,8 @@ async def delete_user(
         
     except AuthApiError as e:
         # If auth deletion fails but profile was deleted, that's still partial success
-        print(f"Warning: Auth deletion failed: {e}")
+        logger.warning("Auth deletion failed for user %s: %s", user_id, e)
         return {"message": "User profile deleted, but auth entry may remain"}
     except Exception as e:
-        print(f"Error deleting user: {e}")
+        logger.exception("delete_user failed")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,345 +1,221 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, status
-from typing import List, Optional
-from app.models import WalletTransaction, WalletRecharge, JournalVoucher
+import hashlib
+
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from typing import Optional
+from app.models import WalletRecharge, JournalVoucher
 from app.core.auth import get_current_user, CurrentUser
-from app.core.supabase import get_supabase_client, get_supabase_admin_client
-from supabase import Client
+from app.core.supabase import get_supabase_async_client, get_supabase_async_admin_client
+from supabase import AsyncClient
 from datetime import datetime
 from app.services.audit import log_wallet_recharge
+from cachetools import TTLCache
 
 router = APIRouter(prefix="/wallet", tags=["Wallet Management"])
 
+# Dashboards poll the transaction listing with identical filters every
+# few seconds; a short TTL absorbs those repeats. Write endpoints clear
+# the cache so fresh balances show up immediately.
+_tx_cache: TTLCache = TTLCache(maxsize=1024, ttl=5)
+
 
-@router.get("/transactions", response_model=List[WalletTransaction])
+# response_class skips per-row Pydantic validation: PostgREST rows are
+# trusted and histories can run to thousands of transactions
+@router.get("/transactions", response_class=ORJSONResponse)
 async def get_wallet_transactions(
+    request: Request,
+    http_response: Response,
     distributor_id: Optional[str] = Query(None),
     store_id: Optional[str] = Query(None),
     portal_type: Optional[str] = Query(None),
     portal_id: Optional[str] = Query(None),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    supabase: Client = Depends(get_supabase_client)
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="date of the last row of the previous page"),
+    supabase: AsyncClient = Depends(get_supabase_async_client)
 ):
     """
-    Get wallet transactions, optionally filtered by distributor, store, portal, or date range
+    Get wallet transactions, optionally filtered by distributor, store, portal, or date range.
+
+    Pass limit together with the date of the last received row as cursor
+    to page through long histories (keyset pagination on the indexed
+    date column) instead of fetching everything.
+
+    Unexpected errors propagate to the app-level exception handler.
     """
-    try:
-        query = supabase.table("wallet_transactions").select("*")
+    cache_key = (distributor_id, store_id, portal_type, portal_id, start_date, end_date, limit, cursor)
+    data = _tx_cache.get(cache_key)
+    if data is None:
+        data = await _fetch_transactions(
+            supabase, distributor_id, store_id, portal_type, portal_id,
+            start_date, end_date, limit, cursor,
+        )
+        _tx_cache[cache_key] = data
+
+    # HTTP-level caching: a client revalidating with If-None-Match gets
+    # a bodyless 304 when the result hasn't changed
+    etag = f'"{hashlib.md5(orjson.dumps(data)).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    http_response.headers["ETag"] = etag
+    return data
+
+
+async def _fetch_transactions(
+    supabase: AsyncClient,
+    distributor_id: Optional[str],
+    store_id: Optional[str],
+    portal_type: Optional[str],
+    portal_id: Optional[str],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    limit: Optional[int],
+    cursor: Optional[str],
+):
+    query = supabase.table("wallet_transactions").select("*")
 
-        if distributor_id:
-            query = query.eq("distributor_id", distributor_id)
-        elif store_id:
-            query = query.eq("store_id", store_id)
-        elif portal_type == "store" and portal_id:
-            # Get distributors for this store
-            dist_response = supabase.table("distributors").select("id").eq("store_id", portal_id).execute()
-            dist_ids = [d["id"] for d in dist_response.data]
-            if dist_ids:
-                query = query.in_("distributor_id", dist_ids)
+    if distributor_id:
+        query = query.eq("distributor_id", distributor_id)
+    elif store_id:
+        query = query.eq("store_id", store_id)
+    elif portal_type == "store" and portal_id:
+        # Filter on the store through the joining view (migration
+        # 018) instead of fetching the distributor ids first
+        query = supabase.table("wallet_transactions_with_store").select("*").eq("derived_store_id", portal_id)
 
-        if start_date:
-            query = query.gte("date", start_date)
-        if end_date:
-            query = query.lte("date", end_date)
+    if start_date:
+        query = query.gte("date", start_date)
+    if end_date:
+        query = query.lte("date", end_date)
+    if cursor:
+        query = query.lt("date", cursor)
 
-        response = query.order("date", desc=True).execute()
-        return response.data
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    query = query.order("date", desc=True)
+    if limit:
+        query = query.limit(limit)
+
+    response = await query.execute()
+    return response.data
 
 
 @router.post("/recharge", status_code=status.HTTP_201_CREATED)
 async def recharge_wallet(
     recharge: WalletRecharge,
     current_user: CurrentUser = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_admin_client)
+    supabase: AsyncClient = Depends(get_supabase_async_admin_client)
 ):
     """
     Recharge distributor or store wallet
     """
-    try:
-        if recharge.distributorId:
-            # Recharge distributor wallet
-            distributor = supabase.table("distributors").select("wallet_balance").eq("id", recharge.distributorId).single().execute()
-            if not distributor.data:
-                raise HTTPException(status_code=404, detail="Distributor not found")
-
-            current_wallet_balance = distributor.data["wallet_balance"]
-
-            # First, insert the new recharge transaction (we'll calculate balance later)
-            supabase.table("wallet_transactions").insert({
-                "distributor_id": recharge.distributorId,
-                "date": recharge.date,
-                "type": "RECHARGE",
-                "amount": recharge.amount,
-                "balance_after": 0,  # Temporary, will recalculate
-                "payment_method": recharge.paymentMethod,
-                "remarks": recharge.remarks,
-                "initiated_by": current_user.email
-            }).execute()
-
-            # Get ALL transactions for this distributor in chronological order
-            all_txs = supabase.table("wallet_transactions")\
-                .select("*")\
-                .eq("distributor_id", recharge.distributorId)\
-                .order("date", desc=False)\
-                .execute()
+    account_type = "distributor" if recharge.distributor_id else "store"
+    account_id = recharge.distributor_id or recharge.store_id
 
-            # Recalculate balances for all transactions in chronological order
-            running_balance = 0.0
-            for tx in all_txs.data:
-                # The amount field in the database is already signed (negative for deductions)
-                # So we just add it directly to the running balance
-                running_balance += tx["amount"]
-
-                # Update the transaction's balanceAfter
-                supabase.table("wallet_transactions")\
-                    .update({"balance_after": running_balance})\
-                    .eq("id", tx["id"])\
-                    .execute()
-
-            # Update the distributor's current wallet balance
-            supabase.table("distributors").update({"wallet_balance": running_balance}).eq("id", recharge.distributorId).execute()
-            
-            # Audit log
-            await log_wallet_recharge(
-                distributor_id=recharge.distributorId,
-                user_id=current_user.id,
-                username=current_user.email,
-                amount=recharge.amount,
-                new_balance=running_balance
-            )
-
-        elif recharge.storeId:
-            # Recharge store wallet
-            store = supabase.table("stores").select("wallet_balance").eq("id", recharge.storeId).single().execute()
-            if not store.data:
-                raise HTTPException(status_code=404, detail="Store not found")
-
-            current_wallet_balance = store.data["wallet_balance"]
-
-            # First, insert the new recharge transaction (we'll calculate balance later)
-            supabase.table("wallet_transactions").insert({
-                "store_id": recharge.storeId,
-                "date": recharge.date,
-                "type": "RECHARGE",
-                "amount": recharge.amount,
-                "balance_after": 0,  # Temporary, will recalculate
-                "payment_method": recharge.paymentMethod,
-                "remarks": recharge.remarks,
-                "initiated_by": current_user.email
-            }).execute()
-
-            # Get ALL transactions for this store in chronological order
-            all_txs = supabase.table("wallet_transactions")\
-                .select("*")\
-                .eq("store_id", recharge.storeId)\
-                .order("date", desc=False)\
-                .execute()
-
-            # Recalculate balances for all transactions in chronological order
-            running_balance = 0.0
-            for tx in all_txs.data:
-                # The amount field in the database is already signed (negative for deductions)
-                # So we just add it directly to the running balance
-                running_balance += tx["amount"]
+    # Existence check, insert and balance read happen in one RPC
+    # (see migration 017); the triggers from migration 016 maintain
+    # balance_after and the account's wallet_balance
+    try:
+        result = await supabase.rpc("record_wallet_transaction", {
+            "p_account_type": account_type,
+            "p_account_id": account_id,
+            "p_date": recharge.date,
+            "p_type": "RECHARGE",
+            "p_amount": recharge.amount,
+            "p_payment_method": recharge.payment_method,
+            "p_remarks": recharge.remarks,
+            "p_user": current_user.email
+        }).execute()
+    except Exception as e:
+        if "not found" in str(e):
+            raise HTTPException(status_code=404, detail=str(e))
+        raise
 
-                # Update the transaction's balanceAfter
-                supabase.table("wallet_transactions")\
-                    .update({"balance_after": running_balance})\
-                    .eq("id", tx["id"])\
-                    .execute()
+    _tx_cache.clear()
 
-            # Update the store's current wallet balance
-            supabase.table("stores").update({"wallet_balance": running_balance}).eq("id", recharge.storeId).execute()
-            
-            # Audit log
-            await log_wallet_recharge(
-                distributor_id=recharge.storeId,
-                user_id=current_user.id,
-                username=current_user.email,
-                amount=recharge.amount,
-                new_balance=running_balance
-            )
+    # Audit log
+    await log_wallet_recharge(
+        distributor_id=account_id,
+        user_id=current_user.id,
+        username=current_user.email,
+        amount=recharge.amount,
+        new_balance=result.data
+    )
 
-        return {"message": "Wallet recharged successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": "Wallet recharged successfully"}
 
 
 @router.post("/journal-voucher", status_code=status.HTTP_201_CREATED)
 async def record_journal_voucher(
     jv: JournalVoucher,
     current_user: CurrentUser = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_admin_client)
+    supabase: AsyncClient = Depends(get_supabase_async_admin_client)
 ):
     """
     Record a journal voucher (manual adjustment) for distributor or store wallet
     Amount can be positive (credit/addition) or negative (debit/deduction)
     """
-    try:
-        if jv.distributorId:
-            # Record JV for distributor wallet
-            distributor = supabase.table("distributors").select("wallet_balance").eq("id", jv.distributorId).single().execute()
-            if not distributor.data:
-                raise HTTPException(status_code=404, detail="Distributor not found")
-
-            # First, insert the new JV transaction
-            supabase.table("wallet_transactions").insert({
-                "distributor_id": jv.distributorId,
-                "date": jv.date,
-                "type": "JOURNAL_VOUCHER",
-                "amount": jv.amount,  # Can be positive or negative
-                "balance_after": 0,  # Temporary, will recalculate
-                "payment_method": None,  # JV doesn't have payment method
-                "remarks": jv.remarks,
-                "initiated_by": current_user.email
-            }).execute()
+    account_type = "distributor" if jv.distributor_id else "store"
+    account_id = jv.distributor_id or jv.store_id
 
-            # Get ALL transactions for this distributor in chronological order
-            all_txs = supabase.table("wallet_transactions")\
-                .select("*")\
-                .eq("distributor_id", jv.distributorId)\
-                .order("date", desc=False)\
-                .execute()
-
-            # Recalculate balances for all transactions in chronological order
-            running_balance = 0.0
-            for tx in all_txs.data:
-                running_balance += tx["amount"]
-                supabase.table("wallet_transactions")\
-                    .update({"balance_after": running_balance})\
-                    .eq("id", tx["id"])\
-                    .execute()
-
-            # Update the distributor's current wallet balance
-            supabase.table("distributors").update({"wallet_balance": running_balance}).eq("id", jv.distributorId).execute()
-
-        elif jv.storeId:
-            # Record JV for store wallet
-            store = supabase.table("stores").select("wallet_balance").eq("id", jv.storeId).single().execute()
-            if not store.data:
-                raise HTTPException(status_code=404, detail="Store not found")
-
-            # First, insert the new JV transaction
-            supabase.table("wallet_transactions").insert({
-                "store_id": jv.storeId,
-                "date": jv.date,
-                "type": "JOURNAL_VOUCHER",
-                "amount": jv.amount,  # Can be positive or negative
-                "balance_after": 0,  # Temporary, will recalculate
-                "payment_method": None,  # JV doesn't have payment method
-                "remarks": jv.remarks,
-                "initiated_by": current_user.email
-            }).execute()
-
-            # Get ALL transactions for this store in chronological order
-            all_txs = supabase.table("wallet_transactions")\
-                .select("*")\
-                .eq("store_id", jv.storeId)\
-                .order("date", desc=False)\
-                .execute()
-
-            # Recalculate balances for all transactions in chronological order
-            running_balance = 0.0
-            for tx in all_txs.data:
-                running_balance += tx["amount"]
-                supabase.table("wallet_transactions")\
-                    .update({"balance_after": running_balance})\
-                    .eq("id", tx["id"])\
-                    .execute()
-
-            # Update the store's current wallet balance
-            supabase.table("stores").update({"wallet_balance": running_balance}).eq("id", jv.storeId).execute()
-
-        return {"message": "Journal voucher recorded successfully"}
+    # Existence check, insert and balance read happen in one RPC
+    # (see migration 017); amount can be positive or negative and
+    # JVs carry no payment method
+    try:
+        await supabase.rpc("record_wallet_transaction", {
+            "p_account_type": account_type,
+            "p_account_id": account_id,
+            "p_date": jv.date,
+            "p_type": "JOURNAL_VOUCHER",
+            "p_amount": jv.amount,
+            "p_payment_method": None,
+            "p_remarks": jv.remarks,
+            "p_user": current_user.email
+        }).execute()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        if "not found" in str(e):
+            raise HTTPException(status_code=404, detail=str(e))
+        raise
 
+    _tx_cache.clear()
+
+    return {"message": "Journal voucher recorded successfully"}
 
 
 @router.post("/recalculate/{account_type}/{account_id}")
 async def recalculate_wallet_balances(
     account_type: str,
     account_id: str,
-    supabase: Client = Depends(get_supabase_admin_client)
+    supabase: AsyncClient = Depends(get_supabase_async_admin_client)
 ):
     """
     Utility endpoint to recalculate all wallet balances for a distributor or store
     Use this to fix incorrect historical balances
     """
-    try:
-        if account_type == "distributor":
-            # Verify distributor exists
-            distributor = supabase.table("distributors").select("id").eq("id", account_id).single().execute()
-            if not distributor.data:
-                raise HTTPException(status_code=404, detail="Distributor not found")
-
-            # Get ALL transactions for this distributor in chronological order
-            all_txs = supabase.table("wallet_transactions")\
-                .select("*")\
-                .eq("distributor_id", account_id)\
-                .order("date", desc=False)\
-                .execute()
-
-            # Recalculate balances for all transactions in chronological order
-            running_balance = 0.0
-            for tx in all_txs.data:
-                # The amount field in the database is already signed (negative for deductions)
-                # So we just add it directly to the running balance
-                running_balance += tx["amount"]
-
-                # Update the transaction's balanceAfter
-                supabase.table("wallet_transactions")\
-                    .update({"balance_after": running_balance})\
-                    .eq("id", tx["id"])\
-                    .execute()
-
-            # Update the distributor's current wallet balance
-            supabase.table("distributors").update({"wallet_balance": running_balance}).eq("id", account_id).execute()
-
-            return {
-                "message": f"Recalculated {len(all_txs.data)} transactions for distributor",
-                "final_balance": running_balance,
-                "transactions_updated": len(all_txs.data)
-            }
-
-        elif account_type == "store":
-            # Verify store exists
-            store = supabase.table("stores").select("id").eq("id", account_id).single().execute()
-            if not store.data:
-                raise HTTPException(status_code=404, detail="Store not found")
-
-            # Get ALL transactions for this store in chronological order
-            all_txs = supabase.table("wallet_transactions")\
-                .select("*")\
-                .eq("store_id", account_id)\
-                .order("date", desc=False)\
-                .execute()
-
-            # Recalculate balances for all transactions in chronological order
-            running_balance = 0.0
-            for tx in all_txs.data:
-                # The amount field in the database is already signed (negative for deductions)
-                # So we just add it directly to the running balance
-                running_balance += tx["amount"]
-
-                # Update the transaction's balanceAfter
-                supabase.table("wallet_transactions")\
-                    .update({"balance_after": running_balance})\
-                    .eq("id", tx["id"])\
-                    .execute()
-
-            # Update the store's current wallet balance
-            supabase.table("stores").update({"wallet_balance": running_balance}).eq("id", account_id).execute()
-
-            return {
-                "message": f"Recalculated {len(all_txs.data)} transactions for store",
-                "final_balance": running_balance,
-                "transactions_updated": len(all_txs.data)
-            }
-        else:
-            raise HTTPException(status_code=400, detail="account_type must be 'distributor' or 'store'")
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    if account_type == "distributor":
+        # Verify distributor exists
+        account = await supabase.table("distributors").select("id").eq("id", account_id).single().execute()
+        if not account.data:
+            raise HTTPException(status_code=404, detail="Distributor not found")
+    elif account_type == "store":
+        # Verify store exists
+        account = await supabase.table("stores").select("id").eq("id", account_id).single().execute()
+        if not account.data:
+            raise HTTPException(status_code=404, detail="Store not found")
+    else:
+        raise HTTPException(status_code=400, detail="account_type must be 'distributor' or 'store'")
+
+    # One RPC rewrites every balance_after with a window function and
+    # syncs the account's wallet balance (see migration 015)
+    result = await supabase.rpc("recalc_wallet_balances", {
+        "p_account_type": account_type,
+        "p_account_id": account_id
+    }).execute()
+    row = result.data[0]
+    _tx_cache.clear()
+
+    return {
+        "message": f"Recalculated {row['transactions_updated']} transactions for {account_type}",
+        "final_balance": row["final_balance"],
+        "transactions_updated": row["transactions_updated"]
+    }
@@ -3,17 +3,63 @@ JWT Authentication Module
 Validates Supabase JWT tokens and provides user info to protected routes.
 """
 
+import asyncio
+import hashlib
+import logging
+import time
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 import httpx
+from cachetools import TTLCache
+from jose import JWTError, jwt
 from pydantic import BaseModel
 from app.core.config import settings
+from app.core.supabase import get_supabase_admin_client
+
 
+logger = logging.getLogger(__name__)
 
 # Security scheme for Swagger docs
 security = HTTPBearer(auto_error=False)
 
+# Verified-token cache keyed by a hash of the token (never the token
+# itself). Values are (user_data, monotonic expiry); the expiry is
+# capped by the token's own exp claim so entries never outlive it.
+_token_cache: TTLCache = TTLCache(maxsize=4096, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+# In-flight verifications by token hash: concurrent requests carrying
+# the same token await the leader's future instead of each calling out
+_inflight: dict = {}
+
+# Role/store/permissions rows change rarely; a short TTL keeps a burst
+# of requests from the same user to one profile query. Write paths in
+# the users router evict entries via evict_profile().
+_profile_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+
+def evict_profile(user_id: str) -> None:
+    """Drop the cached profile for a user after their row changes."""
+    _profile_cache.pop(user_id, None)
+
+
+# Shared HTTP client for GoTrue calls - created lazily (first use is
+# inside the running event loop) and kept for the process lifetime so
+# the TCP+TLS connection is reused across auth checks
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            base_url=settings.SUPABASE_URL,
+            timeout=5.0,
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+        )
+    return _http_client
+
 
 class TokenData(BaseModel):
     """User data extracted from JWT token"""
@@ -31,31 +77,81 @@ class CurrentUser(BaseModel):
     permissions: list = []
 
 
+def _cache_token(key: bytes, token: str, user_data: dict) -> None:
+    """Cache a verified token, never past its own expiry."""
+    ttl = settings.AUTH_CACHE_TTL_SECONDS
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+        if exp is not None:
+            ttl = min(ttl, exp - time.time())
+    except Exception:
+        pass
+    if ttl > 0:
+        _token_cache[key] = (user_data, time.monotonic() + ttl)
+
+
 async def verify_supabase_token(token: str) -> Optional[dict]:
     """
     Verify a Supabase JWT token by calling Supabase's auth API.
     Returns user data if valid, None if invalid.
+    Repeat requests within the cache window skip the network round-trip.
     """
+    key = hashlib.sha256(token.encode()).digest()
+    entry = _token_cache.get(key)
+    if entry is not None:
+        user_data, expires_at = entry
+        if time.monotonic() < expires_at:
+            return user_data
+        _token_cache.pop(key, None)
+
+    # With the project JWT secret configured, verification is a local
+    # HS256 signature check - microseconds instead of a network call.
+    # Without it, fall through to the auth API.
+    if settings.SUPABASE_JWT_SECRET:
+        try:
+            claims = jwt.decode(
+                token,
+                settings.SUPABASE_JWT_SECRET,
+                algorithms=["HS256"],
+                audience="authenticated",
+            )
+        except JWTError:
+            return None
+        user_data = {
+            "id": claims["sub"],
+            "email": claims.get("email", ""),
+            "role": claims.get("role"),
+        }
+        _cache_token(key, token, user_data)
+        return user_data
+
+    # A cold-cache burst (dashboard firing parallel API calls) shares a
+    # single verification instead of fanning out identical requests
+    inflight = _inflight.get(key)
+    if inflight is not None:
+        return await inflight
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
     try:
-        # Supabase auth API endpoint
-        url = f"{settings.SUPABASE_URL}/auth/v1/user"
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
+        result = None
+        try:
+            response = await _get_http_client().get(
+                "/auth/v1/user",
                 headers={
                     "Authorization": f"Bearer {token}",
                     "apikey": settings.SUPABASE_KEY
                 }
             )
-            
             if response.status_code == 200:
-                return response.json()
-            return None
-            
-    except Exception as e:
-        print(f"[AUTH ERROR] Token verification failed: {e}")
-        return None
+                result = response.json()
+                _cache_token(key, token, result)
+        except Exception:
+            logger.exception("Token verification failed")
+        future.set_result(result)
+        return result
+    finally:
+        _inflight.pop(key, None)
 
 
 async def get_current_user(
@@ -82,15 +178,17 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get additional user info from public.users table
-    from app.core.supabase import get_supabase_admin_client
-    supabase = get_supabase_admin_client()
-    
-    try:
-        user_profile = supabase.table("users").select("*").eq("id", user_data["id"]).single().execute()
-        profile = user_profile.data if user_profile.data else {}
-    except:
-        profile = {}
+    # Get additional user info from public.users table (cached)
+    profile = _profile_cache.get(user_data["id"])
+    if profile is None:
+        supabase = get_supabase_admin_client()
+
+        try:
+            user_profile = supabase.table("users").select("*").eq("id", user_data["id"]).single().execute()
+            profile = user_profile.data if user_profile.data else {}
+        except:
+            profile = {}
+        _profile_cache[user_data["id"]] = profile
     
     return CurrentUser(
         id=user_data["id"],
@@ -110,11 +208,15 @@ async def get_current_user_optional(
     """
     if not credentials:
         return None
-    
+
     try:
         return await get_current_user(credentials)
-    except HTTPException:
-        return None
+    except HTTPException as e:
+        # Only swallow the "not authenticated" case; anything else
+        # (403s, downstream errors) should still surface
+        if e.status_code == status.HTTP_401_UNAUTHORIZED:
+            return None
+        raise
 
 
 def require_role(*allowed_roles: str):
@@ -122,8 +224,11 @@ def require_role(*allowed_roles: str):
     Dependency factory to require specific roles.
     Usage: Depends(require_role("admin", "manager"))
     """
+    # Hash lookup instead of a linear scan on every request
+    allowed = frozenset(allowed_roles)
+
     async def role_checker(current_user: CurrentUser = Depends(get_current_user)):
-        if current_user.role not in allowed_roles:
+        if current_user.role not in allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Role '{current_user.role}' not authorized. Required: {allowed_roles}"
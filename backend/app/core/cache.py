@@ -0,0 +1,30 @@
+"""
+In-process TTL caches for small, rarely-changing lookup data.
+
+These caches trade a short staleness window (the TTL) for skipping a
+Postgres round trip on hot lookups. Mutation endpoints must call the
+matching evict_* helper so writes become visible immediately.
+"""
+
+from cachetools import TTLCache
+
+# SKU id -> carton_size. Carton sizes change rarely; 10 minutes staleness
+# is acceptable because update/delete endpoints evict explicitly.
+sku_carton_size_cache = TTLCache(maxsize=10_000, ttl=600)
+
+# SKU id -> price. Used on the transfer/order hot paths.
+sku_price_cache = TTLCache(maxsize=10_000, ttl=600)
+
+# Store id -> name. Stores are renamed almost never.
+store_name_cache = TTLCache(maxsize=1_000, ttl=600)
+
+
+def evict_sku(sku_id: str):
+    """Drop all cached values for a SKU after it is updated or deleted"""
+    sku_carton_size_cache.pop(sku_id, None)
+    sku_price_cache.pop(sku_id, None)
+
+
+def evict_store(store_id: str):
+    """Drop all cached values for a store after it is updated or deleted"""
+    store_name_cache.pop(store_id, None)
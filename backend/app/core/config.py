@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -9,18 +11,26 @@ class Settings(BaseSettings):
     SUPABASE_URL: str
     SUPABASE_KEY: str
     SUPABASE_SERVICE_KEY: Optional[str] = None
+    # Project JWT secret; when set, tokens are verified locally instead
+    # of calling the auth API on every request
+    SUPABASE_JWT_SECRET: Optional[str] = None
 
     # API Configuration
     API_V1_PREFIX: str = "/api/v1"
     PROJECT_NAME: str = "Distributor Management System"
 
-    # CORS Configuration
-    ALLOWED_ORIGINS: list = [
+    # CORS Configuration. Vercel preview deployments are matched by
+    # regex in main.py - Starlette does not glob-expand "*.vercel.app",
+    # and the old "*" wildcard is silently ignored with credentials on.
+    ALLOWED_ORIGINS: tuple = (
         "http://localhost:5173",
         "http://localhost:3000",
-        "https://*.vercel.app",
-        "*"
-    ]
+    )
+    ALLOWED_ORIGIN_REGEX: str = r"https://.*\.vercel\.app"
+
+    # Auth verification cache (seconds a verified token is trusted
+    # without re-checking; entries never outlive the token's exp claim)
+    AUTH_CACHE_TTL_SECONDS: int = 300
 
     # JWT Configuration (if needed for custom auth)
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -32,4 +42,18 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Parse the environment/.env once per process.
+
+    Usable as a FastAPI dependency, which lets tests swap settings via
+    dependency_overrides without touching the environment.
+    """
+    return Settings()
+
+
+settings = get_settings()
+
+# Location id of the plant in the stock table (stores use their own uuid).
+# Shared here so handlers and services don't each re-declare the literal.
+PLANT_LOCATION_ID = "00000000-0000-0000-0000-000000000000"
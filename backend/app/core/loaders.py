@@ -0,0 +1,81 @@
+"""
+Request-coalescing batch loaders (DataLoader pattern).
+
+Concurrent handlers that need the same kind of keyed lookup (e.g. return
+rows by id, SKU carton sizes by id) register their keys on a shared
+BatchLoader. The loader waits a tiny window, then issues ONE batched
+query for every key collected across all concurrent callers and fans the
+rows back out. A burst of N concurrent requests becomes 1 database query
+instead of N.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+
+# A batch function receives the collected keys and returns a dict mapping
+# each key to its loaded value (missing keys resolve to None).
+BatchFn = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class BatchLoader:
+    """Coalesces per-key loads from concurrent callers into one batched query."""
+
+    def __init__(self, batch_fn: BatchFn, delay: float = 0.001, max_batch_size: int = 500):
+        self._batch_fn = batch_fn
+        self._delay = delay
+        self._max_batch_size = max_batch_size
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._dispatch_task = None
+
+    async def load(self, key: Hashable) -> Any:
+        """Load a single key, sharing the batch with all concurrent callers."""
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+
+            if len(self._pending) >= self._max_batch_size:
+                # Batch is full - flush immediately
+                self._flush_now()
+            elif self._dispatch_task is None:
+                self._dispatch_task = asyncio.create_task(self._dispatch_after_delay())
+
+        return await future
+
+    async def load_many(self, keys: List[Hashable]) -> List[Any]:
+        """Load several keys at once (still coalesced with other callers)."""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    async def _dispatch_after_delay(self):
+        await asyncio.sleep(self._delay)
+        self._dispatch_task = None
+        await self._run_batch(self._take_pending())
+
+    def _flush_now(self):
+        if self._dispatch_task is not None:
+            self._dispatch_task.cancel()
+            self._dispatch_task = None
+        asyncio.create_task(self._run_batch(self._take_pending()))
+
+    def _take_pending(self) -> Dict[Hashable, asyncio.Future]:
+        batch, self._pending = self._pending, {}
+        return batch
+
+    async def _run_batch(self, batch: Dict[Hashable, asyncio.Future]):
+        if not batch:
+            return
+        try:
+            results = await self._batch_fn(list(batch.keys()))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            # Consume the exception we just set so asyncio doesn't warn
+            # if a caller already went away.
+            for future in batch.values():
+                future.exception()
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(results.get(key))
@@ -0,0 +1,34 @@
+"""
+Queue-backed logging setup.
+Handlers on the request path only enqueue the LogRecord; a background
+listener thread does the actual stream I/O, so logging never blocks a
+handler under load.
+"""
+
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue
+from typing import Optional
+
+_queue: Queue = Queue(-1)
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging() -> None:
+    """Install the queue handler on the root logger (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler()
+    stream.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+    _listener = QueueListener(_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(_queue))
+    root.setLevel(logging.INFO)
@@ -1,13 +1,47 @@
-from supabase import create_client, Client
+from functools import lru_cache
+from typing import Optional
+
+from supabase import create_client, Client, create_async_client, AsyncClient
 from app.core.config import settings
 
 
+# The sync clients are cached as process-wide singletons: constructing a
+# client builds auth/postgrest sub-clients and a new HTTP connection pool,
+# which is wasted work per request and defeats connection keep-alive. The
+# clients hold no per-request state here (anon and service keys only).
+
+@lru_cache(maxsize=1)
 def get_supabase_client() -> Client:
-    """Get Supabase client instance"""
+    """Get shared Supabase client instance"""
     return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
 
+@lru_cache(maxsize=1)
 def get_supabase_admin_client() -> Client:
-    """Get Supabase admin client with service role key"""
+    """Get shared Supabase admin client with service role key"""
     service_key = settings.SUPABASE_SERVICE_KEY or settings.SUPABASE_KEY
     return create_client(settings.SUPABASE_URL, service_key)
+
+
+# Shared async clients. The sync client blocks the event loop for the full
+# duration of every PostgREST round trip; these use httpx's async transport
+# so other requests keep running while a query is in flight.
+_async_client: Optional[AsyncClient] = None
+_async_admin_client: Optional[AsyncClient] = None
+
+
+async def get_supabase_async_client() -> AsyncClient:
+    """Get shared async Supabase client (non-blocking transport)"""
+    global _async_client
+    if _async_client is None:
+        _async_client = await create_async_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+    return _async_client
+
+
+async def get_supabase_async_admin_client() -> AsyncClient:
+    """Get shared async Supabase admin client with service role key"""
+    global _async_admin_client
+    if _async_admin_client is None:
+        service_key = settings.SUPABASE_SERVICE_KEY or settings.SUPABASE_KEY
+        _async_admin_client = await create_async_client(settings.SUPABASE_URL, service_key)
+    return _async_admin_client
@@ -1,53 +1,92 @@
+import logging
+
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from app.core.config import settings
+from app.core.logging import setup_logging
+from app.core.supabase import get_supabase_admin_client
 from app.api.routes import auth, distributors, orders, stock, wallet, products, stores, reports, migrations, companies, users, audit, returns
 
+setup_logging()
+
+logger = logging.getLogger(__name__)
+
 # Create FastAPI app with optimizations
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version="1.0.0",
     description="Backend API for Distributor Management System",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # orjson serializes our list-heavy payloads several times faster than
+    # the stdlib encoder
+    default_response_class=ORJSONResponse
 )
 
 # Add custom validation error handler
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    print(f"[VALIDATION ERROR] Path: {request.url.path}")
-    print(f"[VALIDATION ERROR] Body: {await request.body()}")
-    print(f"[VALIDATION ERROR] Errors: {exc.errors()}")
+    # Only buffer small bodies into the log line - large (or
+    # maliciously large) payloads are skipped
+    body = b"<skipped>"
+    if int(request.headers.get("content-length", 0)) < 4096:
+        body = await request.body()
+    logger.warning(
+        "Validation error on %s: %s (body: %s)",
+        request.url.path, exc.errors(), body,
+    )
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={"detail": exc.errors()},
     )
 
+# Catch-all for endpoints that let unexpected errors propagate instead
+# of wrapping every body in try/except: log the traceback once and
+# return a generic 500 without leaking internals to the client
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    logger.exception("Unhandled error on %s", request.url.path)
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={"detail": "Internal server error"},
+    )
+
+# Compress large JSON payloads (stock lists, transfer histories,
+# statements) for clients that accept gzip; small responses are passed
+# through untouched
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
+    allow_origin_regex=settings.ALLOWED_ORIGIN_REGEX,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
 # Include routers
-app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
-app.include_router(distributors.router, prefix=settings.API_V1_PREFIX)
-app.include_router(orders.router, prefix=settings.API_V1_PREFIX)
-app.include_router(stock.router, prefix=settings.API_V1_PREFIX)
-app.include_router(wallet.router, prefix=settings.API_V1_PREFIX)
-app.include_router(products.router, prefix=settings.API_V1_PREFIX)
-app.include_router(stores.router, prefix=settings.API_V1_PREFIX)
-app.include_router(companies.router, prefix=settings.API_V1_PREFIX)
-app.include_router(reports.router, prefix=settings.API_V1_PREFIX)
-app.include_router(migrations.router, prefix=settings.API_V1_PREFIX)
-app.include_router(users.router, prefix=settings.API_V1_PREFIX)
-app.include_router(audit.router, prefix=settings.API_V1_PREFIX)
-app.include_router(returns.router, prefix=settings.API_V1_PREFIX)
+ROUTERS = (
+    auth.router,
+    distributors.router,
+    orders.router,
+    stock.router,
+    wallet.router,
+    products.router,
+    stores.router,
+    companies.router,
+    reports.router,
+    migrations.router,
+    users.router,
+    audit.router,
+    returns.router,
+)
+for router in ROUTERS:
+    app.include_router(router, prefix=settings.API_V1_PREFIX)
 
 
 @app.get("/")
@@ -72,7 +111,6 @@ async def keepalive():
     Keepalive endpoint for cron jobs to prevent cold starts.
     Also warms up database connection.
     """
-    from app.core.supabase import get_supabase_admin_client
     try:
         # Warm up the database connection
         supabase = get_supabase_admin_client()
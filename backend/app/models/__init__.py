@@ -15,7 +15,7 @@ from .orders import (
 )
 from .transactions import WalletTransaction, WalletRecharge, JournalVoucher
 from .inventory import (
-    StockItem, StockProduction, StockTransfer, StockTransferCreate, StockTransferBase
+    StockItem, StockLine, StockProduction, StockTransfer, StockTransferCreate, StockTransferBase
 )
 from .company import Company, CompanyCreate, CompanyBase
 from .notifications import Notification
@@ -6,6 +6,13 @@ from pydantic.alias_generators import to_camel
 base_config = ConfigDict(
     populate_by_name=True,
     alias_generator=to_camel,
-    from_attributes=True,
-    ser_json_by_alias=True
+    ser_json_by_alias=True,
+    # Store plain member values on instances so serialization skips the
+    # .value lookup per enum field
+    use_enum_values=True
 )
+
+# Variant for response-only models: they never mutate after
+# construction, so freezing skips the assignment-validator path and
+# makes instances hashable
+frozen_config = ConfigDict(**base_config, frozen=True)
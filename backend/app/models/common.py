@@ -1,17 +1,17 @@
-from enum import Enum
+from enum import StrEnum
 
-class UserRole(str, Enum):
+class UserRole(StrEnum):
     PLANT_ADMIN = "Plant Admin"
     ASM = "ASM"
     EXECUTIVE = "Executive"
     STORE_ADMIN = "Store Admin"
     USER = "User"
 
-class OrderStatus(str, Enum):
+class OrderStatus(StrEnum):
     PENDING = "Pending"
     DELIVERED = "Delivered"
 
-class TransactionType(str, Enum):
+class TransactionType(StrEnum):
     RECHARGE = "RECHARGE"
     ORDER_PAYMENT = "ORDER_PAYMENT"
     TRANSFER_PAYMENT = "TRANSFER_PAYMENT"
@@ -19,18 +19,18 @@ class TransactionType(str, Enum):
     RETURN_CREDIT = "RETURN_CREDIT"
     JOURNAL_VOUCHER = "JOURNAL_VOUCHER"
 
-class NotificationType(str, Enum):
+class NotificationType(StrEnum):
     WALLET_LOW = "WALLET_LOW"
     ORDER_PLACED = "ORDER_PLACED"
     ORDER_FAILED = "ORDER_FAILED"
     NEW_SCHEME = "NEW_SCHEME"
     DISTRIBUTOR_ADDED = "DISTRIBUTOR_ADDED"
 
-class ReturnStatus(str, Enum):
+class ReturnStatus(StrEnum):
     PENDING = "PENDING"
     CONFIRMED = "CONFIRMED"
 
-class StockMovementType(str, Enum):
+class StockMovementType(StrEnum):
     PRODUCTION = "PRODUCTION"
     TRANSFER_OUT = "TRANSFER_OUT"
     TRANSFER_IN = "TRANSFER_IN"
@@ -41,15 +41,15 @@ class StockMovementType(str, Enum):
     UNRESERVED = "UNRESERVED"
     COMPLETELY_DAMAGED = "COMPLETELY_DAMAGED"
 
-class StockTransferStatus(str, Enum):
+class StockTransferStatus(StrEnum):
     PENDING = "Pending"
     DELIVERED = "Delivered"
 
-class ProductType(str, Enum):
+class ProductType(StrEnum):
     VOLUME = "Volume"
     MASS = "Mass"
 
-class ProductStatus(str, Enum):
+class ProductStatus(StrEnum):
     ACTIVE = "Active"
     DISCONTINUED = "Discontinued"
     OUT_OF_STOCK = "Out of Stock"
@@ -10,28 +10,28 @@ class TransportMode(str, Enum):
     SHIP = "Ship"
 
 class EWayBillGenerateRequest(BaseModel):
-    order_id: str = Field(alias="orderId")
-    vehicle_number: str = Field(alias="vehicleNumber")
-    transporter_id: Optional[str] = Field(None, alias="transporterId")
-    transporter_name: Optional[str] = Field(None, alias="transporterName")
-    transport_mode: TransportMode = Field(alias="transportMode")
-    distance_km: int = Field(alias="distanceKm", gt=0)
+    order_id: str
+    vehicle_number: str
+    transporter_id: Optional[str] = None
+    transporter_name: Optional[str] = None
+    transport_mode: TransportMode
+    distance_km: int = Field(gt=0)
     
     model_config = base_config
 
 class EWayBillUpdateVehicleRequest(BaseModel):
-    vehicle_number: str = Field(alias="vehicleNumber")
-    transporter_id: Optional[str] = Field(None, alias="transporterId")
-    transporter_name: Optional[str] = Field(None, alias="transporterName")
-    transport_mode: TransportMode = Field(alias="transportMode")
+    vehicle_number: str
+    transporter_id: Optional[str] = None
+    transporter_name: Optional[str] = None
+    transport_mode: TransportMode
     reason: str
     
     model_config = base_config
 
 class EWayBillResponse(BaseModel):
-    eway_bill_number: str = Field(alias="ewayBillNumber")
-    eway_bill_date: str = Field(alias="ewayBillDate")
-    valid_until: str = Field(alias="validUntil")
+    eway_bill_number: str
+    eway_bill_date: str
+    valid_until: str
     status: str
     alert: Optional[str] = None
     
@@ -1,44 +1,51 @@
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
-from .base_config import base_config
+from typing import List, Optional
+from pydantic import BaseModel
+from .base_config import base_config, frozen_config
 from .common import StockTransferStatus
 
+class StockLine(BaseModel):
+    """One SKU/quantity line inside a production or transfer payload."""
+    sku_id: str
+    quantity: int
+
+    model_config = base_config
+
 class StockItem(BaseModel):
-    sku_id: str = Field(alias="skuId")
+    sku_id: str
     quantity: int
     reserved: int
-    location_id: str = Field(alias="locationId")
-    
-    model_config = base_config
+    location_id: str
+
+    model_config = frozen_config
 
 class StockProduction(BaseModel):
-    items: List[Dict[str, Any]] # Keeping as dict for now to match original
+    items: List[StockLine]
     username: str
     
     model_config = base_config
 
 class StockTransferBase(BaseModel):
-    store_id: str = Field(alias="storeId") # In create
+    store_id: str # In create
     # date: str
     # status: StockTransferStatus
-    initiated_by: str = Field(alias="initiatedBy") # In create username maps to this?
+    initiated_by: str # In create username maps to this?
     
     model_config = base_config
 
 class StockTransfer(BaseModel):
     id: str
-    destination_store_id: str = Field(alias="destinationStoreId")
+    destination_store_id: str
     date: str
     status: StockTransferStatus
-    initiated_by: str = Field(alias="initiatedBy")
-    delivered_date: Optional[str] = Field(None, alias="deliveredDate")
-    total_value: float = Field(alias="totalValue")
+    initiated_by: str
+    delivered_date: Optional[str] = None
+    total_value: float
     
     model_config = base_config
 
 class StockTransferCreate(BaseModel):
-    store_id: str = Field(alias="storeId")
-    items: List[Dict[str, Any]]
+    store_id: str
+    items: List[StockLine]
     username: str
     
     model_config = base_config
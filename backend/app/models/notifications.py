@@ -1,12 +1,12 @@
-from pydantic import BaseModel, Field
-from .base_config import base_config
+from pydantic import BaseModel
+from .base_config import frozen_config
 from .common import NotificationType
 
 class Notification(BaseModel):
     id: str
     date: str
     message: str
-    is_read: bool = Field(alias="isRead")
+    is_read: bool
     type: NotificationType
     
-    model_config = base_config
+    model_config = frozen_config
@@ -1,26 +1,27 @@
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 from .base_config import base_config
 from .common import OrderStatus, ReturnStatus
+from .inventory import StockLine
 
 class OrderItemBase(BaseModel):
-    sku_id: str = Field(alias="skuId")
+    sku_id: str
     quantity: int
-    unit_price: float = Field(alias="unitPrice")
-    is_freebie: bool = Field(alias="isFreebie")
+    unit_price: float
+    is_freebie: bool
     
     model_config = base_config
 
 class OrderItem(OrderItemBase):
     id: str
-    order_id: str = Field(alias="orderId")
-    returned_quantity: int = Field(default=0, alias="returnedQuantity")
+    order_id: str
+    returned_quantity: int = 0
 
 class OrderItemCreate(BaseModel):
-    sku_id: str = Field(alias="skuId")
+    sku_id: str
     quantity: int
-    unit_price: Optional[float] = Field(None, alias="unitPrice")
-    is_freebie: Optional[bool] = Field(False, alias="isFreebie")
+    unit_price: Optional[float] = None
+    is_freebie: Optional[bool] = False
     
     model_config = base_config
 
@@ -41,29 +42,29 @@ class Order(OrderBase):
     shipment_size: float = 0
 
 class OrderCreate(BaseModel):
-    distributor_id: str = Field(alias="distributorId")
+    distributor_id: str
     items: List[OrderItemCreate]
     username: str
-    approval_granted_by: Optional[str] = Field(None, alias="approvalGrantedBy")
+    approval_granted_by: Optional[str] = None
     
     model_config = base_config
 
 class OrderReturnBase(BaseModel):
-    order_id: str = Field(alias="orderId")
-    items: List[dict] # Schema for items in return? keeping dict for now as per original
+    order_id: str
+    items: List[StockLine]
     remarks: str
     
     model_config = base_config
 
 class OrderReturn(OrderReturnBase):
     id: str
-    distributor_id: str = Field(alias="distributorId")
+    distributor_id: str
     status: ReturnStatus
-    initiated_by: str = Field(alias="initiatedBy")
-    initiated_date: str = Field(alias="initiatedDate")
-    confirmed_by: Optional[str] = Field(None, alias="confirmedBy")
-    confirmed_date: Optional[str] = Field(None, alias="confirmedDate")
-    total_credit_amount: float = Field(alias="totalCreditAmount")
+    initiated_by: str
+    initiated_date: str
+    confirmed_by: Optional[str] = None
+    confirmed_date: Optional[str] = None
+    total_credit_amount: float
 
 class OrderReturnCreate(OrderReturnBase):
     username: str
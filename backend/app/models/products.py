@@ -1,6 +1,6 @@
 from typing import Optional, List
-from pydantic import BaseModel, Field
-from .base_config import base_config
+from pydantic import BaseModel
+from .base_config import base_config, frozen_config
 from .common import ProductType, ProductStatus
 
 class SKUBase(BaseModel):
@@ -22,27 +22,29 @@ class SKUBase(BaseModel):
 class SKU(SKUBase):
     id: str
 
+    model_config = frozen_config
+
 class SKUCreate(SKUBase):
     id: str  # Generated by frontend initially?
 
 class SchemeBase(BaseModel):
     description: str
-    buy_sku_id: str = Field(alias="buySkuId")
-    buy_quantity: int = Field(alias="buyQuantity")
-    get_sku_id: str = Field(alias="getSkuId")
-    get_quantity: int = Field(alias="getQuantity")
-    start_date: str = Field(alias="startDate")
-    end_date: str = Field(alias="endDate")
-    is_global: bool = Field(default=False, alias="isGlobal")
-    distributor_id: Optional[str] = Field(None, alias="distributorId")
-    store_id: Optional[str] = Field(None, alias="storeId")
+    buy_sku_id: str
+    buy_quantity: int
+    get_sku_id: str
+    get_quantity: int
+    start_date: str
+    end_date: str
+    is_global: bool = False
+    distributor_id: Optional[str] = None
+    store_id: Optional[str] = None
     
     model_config = base_config
 
 class Scheme(SchemeBase):
     id: str
-    stopped_by: Optional[str] = Field(None, alias="stoppedBy")
-    stopped_date: Optional[str] = Field(None, alias="stoppedDate")
+    stopped_by: Optional[str] = None
+    stopped_date: Optional[str] = None
 
 class SchemeCreate(SchemeBase):
     pass
@@ -56,12 +58,14 @@ class PriceTierBase(BaseModel):
 class PriceTier(PriceTierBase):
     id: str
 
+    model_config = frozen_config
+
 class PriceTierCreate(PriceTierBase):
     pass
 
 class PriceTierItem(BaseModel):
-    tier_id: str = Field(alias="tierId")
-    sku_id: str = Field(alias="skuId")
+    tier_id: str
+    sku_id: str
     price: float
-    
-    model_config = base_config
+
+    model_config = frozen_config
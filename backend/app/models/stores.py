@@ -1,9 +1,9 @@
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Literal, Optional
+from pydantic import BaseModel
 from .base_config import base_config
 
 class PortalState(BaseModel):
-    type: str  # 'plant' or 'store'
+    type: Literal["plant", "store"]
     id: str
     name: Optional[str] = None
     
@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 from .base_config import base_config
 from .common import TransactionType
 
@@ -20,19 +20,19 @@ class WalletTransaction(BaseModel):
     model_config = base_config
 
 class WalletRecharge(BaseModel):
-    distributor_id: Optional[str] = Field(None, alias="distributorId")
-    store_id: Optional[str] = Field(None, alias="storeId")
+    distributor_id: Optional[str] = None
+    store_id: Optional[str] = None
     amount: float
     username: str
-    payment_method: str = Field(alias="paymentMethod")
+    payment_method: str
     remarks: str
     date: str
     
     model_config = base_config
 
 class JournalVoucher(BaseModel):
-    distributor_id: Optional[str] = Field(None, alias="distributorId")
-    store_id: Optional[str] = Field(None, alias="storeId")
+    distributor_id: Optional[str] = None
+    store_id: Optional[str] = None
     amount: float
     username: str
     remarks: str
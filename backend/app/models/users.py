@@ -1,6 +1,6 @@
 from typing import Optional, List
 from pydantic import BaseModel
-from .base_config import base_config
+from .base_config import base_config, frozen_config
 from .common import UserRole
 
 class UserBase(BaseModel):
@@ -15,6 +15,8 @@ class UserBase(BaseModel):
 class User(UserBase):
     id: str
 
+    model_config = frozen_config
+
 class UserCreate(UserBase):
     password: str
 
@@ -1,15 +1,77 @@
-from app.core.supabase import get_supabase_admin_client
-from datetime import datetime
+from app.core.supabase import get_supabase_async_admin_client
+from datetime import datetime, timezone
 from typing import Optional, Any
-import json
+import asyncio
+import logging
+
+
+logger = logging.getLogger(__name__)
 
 
 class AuditLogger:
     """
     Service for logging audit events to the audit_logs table.
     All key operations should be logged for compliance and dispute resolution.
+
+    Events are queued in-process and flushed by a background task in small
+    batches, so request handlers never wait on an audit_logs insert.
     """
-    
+
+    FLUSH_INTERVAL = 0.5  # seconds to let a batch accumulate
+    MAX_BATCH_SIZE = 100
+
+    _queue: Optional[asyncio.Queue] = None
+    _worker: Optional[asyncio.Task] = None
+
+    @classmethod
+    def _ensure_worker(cls):
+        """Create the queue and start the flush task on first use"""
+        if cls._queue is None:
+            cls._queue = asyncio.Queue()
+        if cls._worker is None or cls._worker.done():
+            cls._worker = asyncio.create_task(cls._flush_loop())
+
+    @classmethod
+    async def _flush_loop(cls):
+        while True:
+            # Wait for the next event, give the batch a moment to fill,
+            # then drain whatever else arrived in the meantime
+            batch = [await cls._queue.get()]
+            await asyncio.sleep(cls.FLUSH_INTERVAL)
+            while len(batch) < cls.MAX_BATCH_SIZE:
+                try:
+                    batch.append(cls._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            # Retried operations can enqueue the same event twice inside
+            # one flush window; keep only the first occurrence. The key
+            # covers the payload columns too (repr-ed, as the values are
+            # dicts) - helpers like log_user_updated carry the
+            # distinguishing data solely in new_value, and two different
+            # updates to one entity must both survive
+            seen = set()
+            deduped = []
+            for entry in batch:
+                key = (
+                    entry["action"], entry["entity_type"], entry["entity_id"],
+                    entry["user_id"], entry["details"],
+                    repr(entry["old_value"]), repr(entry["new_value"]),
+                )
+                if key not in seen:
+                    seen.add(key)
+                    deduped.append(entry)
+            batch = deduped
+
+            try:
+                supabase = await get_supabase_async_admin_client()
+                await supabase.table("audit_logs").insert(batch).execute()
+            except Exception:
+                # Don't fail (or retry into) the main operation if audit
+                # logging fails; the queue-backed logger keeps this off
+                # the event loop even during an outage
+                logger.exception("Failed to flush %d audit events", len(batch))
+
     @staticmethod
     async def log(
         action: str,
@@ -22,8 +84,8 @@ class AuditLogger:
         details: Optional[str] = None
     ):
         """
-        Log an audit event.
-        
+        Log an audit event (enqueued; written by the background flusher).
+
         Args:
             action: The action performed (e.g., 'CREATE', 'UPDATE', 'DELETE')
             entity_type: Type of entity (e.g., 'ORDER', 'USER', 'DISTRIBUTOR')
@@ -35,25 +97,28 @@ class AuditLogger:
             details: Additional details or notes
         """
         try:
-            supabase = get_supabase_admin_client()
-            
             log_entry = {
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
                 "action": action,
                 "entity_type": entity_type,
                 "entity_id": entity_id,
                 "user_id": user_id,
                 "username": username,
-                "old_value": json.dumps(old_value) if old_value else None,
-                "new_value": json.dumps(new_value) if new_value else None,
+                # The columns are jsonb - the client serializes the dict
+                # once with the request body; pre-dumping here would store
+                # escaped strings instead of queryable json (and the old
+                # falsy check dropped legitimate {} / 0 values)
+                "old_value": old_value,
+                "new_value": new_value,
                 "details": details
             }
-            
-            supabase.table("audit_logs").insert(log_entry).execute()
-            
-        except Exception as e:
+
+            AuditLogger._ensure_worker()
+            AuditLogger._queue.put_nowait(log_entry)
+
+        except Exception:
             # Don't fail the main operation if audit logging fails
-            print(f"[AUDIT ERROR] Failed to log audit event: {e}")
+            logger.exception("Failed to enqueue audit event")
 
 
 # Convenience functions for common actions
@@ -3,12 +3,22 @@ Stock Alerts Service
 Checks for low stock levels and notifies users.
 """
 
-from app.core.supabase import get_supabase_admin_client
+from app.core.config import PLANT_LOCATION_ID
+from app.core.supabase import get_supabase_async_admin_client
+from dataclasses import dataclass
 from typing import List, Optional
-from pydantic import BaseModel
+from cachetools import TTLCache
 
+# Alert dashboards poll these scans; a short TTL keyed by the filter
+# arguments absorbs repeat calls without letting alerts go stale
+_alerts_cache: TTLCache = TTLCache(maxsize=32, ttl=5)
 
-class LowStockItem(BaseModel):
+
+# A slotted dataclass, not a pydantic model: these are built from rows
+# the DB already filtered, never parsed from input, and FastAPI's
+# encoder serializes dataclasses directly
+@dataclass(slots=True, frozen=True)
+class LowStockItem:
     """A stock item that is below threshold"""
     sku_id: str
     sku_name: str
@@ -39,44 +49,61 @@ class StockAlertService:
             location_id: Optional filter by location
             threshold: Custom threshold (defaults to DEFAULT_LOW_THRESHOLD)
         """
-        supabase = get_supabase_admin_client()
         threshold = threshold or StockAlertService.DEFAULT_LOW_THRESHOLD
+
+        cache_key = (location_id, threshold)
+        cached = _alerts_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        supabase = await get_supabase_async_admin_client()
         
         try:
-            # Get all stock with SKU names
-            query = supabase.table("stock").select("*, skus(name)")
-            
+            # The view computes quantity - reserved (migration 022), so
+            # the threshold filter and sort run in the database and only
+            # low rows come back
+            query = (
+                supabase.table("v_stock_available")
+                .select("*, skus(name)")
+                .lt("available", threshold)
+                .order("available")
+            )
+
             if location_id:
                 query = query.eq("locationId", location_id)
-                
-            response = query.execute()
-            
+
+            response = await query.execute()
+            low_rows = response.data or []
+
+            # Resolve all store names in one query instead of one lookup
+            # per low-stock row
+            store_ids = {
+                item["locationId"] for item in low_rows
+                if item["locationId"] != PLANT_LOCATION_ID
+            }
+            store_names = {}
+            if store_ids:
+                stores = await supabase.table("stores").select("id, name").in_("id", list(store_ids)).execute()
+                store_names = {row["id"]: row["name"] for row in (stores.data or [])}
+
             low_stock_items = []
-            for item in response.data:
-                available = item["quantity"] - item.get("reserved", 0)
-                
-                if available < threshold:
-                    # Get location name
-                    location_name = "Plant"
-                    if item["locationId"] != "00000000-0000-0000-0000-000000000000":
-                        store = supabase.table("stores").select("name").eq("id", item["locationId"]).execute()
-                        if store.data:
-                            location_name = store.data[0]["name"]
-                    
-                    low_stock_items.append(LowStockItem(
-                        sku_id=item["skuId"],
-                        sku_name=item.get("skus", {}).get("name", item["skuId"]),
-                        location_id=item["locationId"],
-                        location_name=location_name,
-                        current_quantity=item["quantity"],
-                        threshold=threshold,
-                        reserved=item.get("reserved", 0),
-                        available=available
-                    ))
-            
-            # Sort by most critical first
-            low_stock_items.sort(key=lambda x: x.available)
-            
+            for item in low_rows:
+                available = item["available"]
+                location_name = store_names.get(item["locationId"], "Plant")
+
+                low_stock_items.append(LowStockItem(
+                    sku_id=item["skuId"],
+                    sku_name=item.get("skus", {}).get("name", item["skuId"]),
+                    location_id=item["locationId"],
+                    location_name=location_name,
+                    current_quantity=item["quantity"],
+                    threshold=threshold,
+                    reserved=item.get("reserved", 0),
+                    available=available
+                ))
+
+            # Already ordered most-critical-first by the view query
+            _alerts_cache[cache_key] = low_stock_items
             return low_stock_items
             
         except Exception as e:
@@ -94,9 +121,14 @@ class StockAlertService:
     @staticmethod
     async def get_stock_summary() -> dict:
         """Get a summary of stock health across all locations"""
+        # The critical items are a subset of the low-stock items, so one
+        # scan at the looser threshold covers both counts
         all_low = await StockAlertService.get_low_stock_items()
-        critical = await StockAlertService.get_critical_stock_items()
-        
+        critical = [
+            item for item in all_low
+            if item.available < StockAlertService.DEFAULT_CRITICAL_THRESHOLD
+        ]
+
         return {
             "total_low_stock_items": len(all_low),
             "total_critical_items": len(critical),
@@ -0,0 +1,63 @@
+"""
+Store Cache Service
+Process-level TTL cache for store reads, invalidated on writes.
+Stores change rarely but are read constantly from dashboards.
+"""
+
+import asyncio
+from typing import Optional
+
+from cachetools import TTLCache
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.cache import evict_store
+
+TTL_SECONDS = 60
+
+_all_stores: TTLCache = TTLCache(maxsize=1, ttl=TTL_SECONDS)
+_by_id: TTLCache = TTLCache(maxsize=512, ttl=TTL_SECONDS)
+_lock = asyncio.Lock()
+
+
+async def get_all(supabase) -> list:
+    """Return all stores, hitting the DB at most once per TTL window."""
+    cached = _all_stores.get("all")
+    if cached is not None:
+        return cached
+    async with _lock:
+        # Another request may have filled the cache while we waited
+        cached = _all_stores.get("all")
+        if cached is not None:
+            return cached
+        response = await run_in_threadpool(supabase.table("stores").select("*").execute)
+        data = response.data or []
+        _all_stores["all"] = data
+        for row in data:
+            _by_id[row["id"]] = row
+        return data
+
+
+async def get_by_id(supabase, store_id: str) -> Optional[dict]:
+    """Return one store, preferring the cache."""
+    cached = _by_id.get(store_id)
+    if cached is not None:
+        return cached
+    response = await run_in_threadpool(
+        supabase.table("stores").select("*").eq("id", store_id).single().execute
+    )
+    if response.data:
+        _by_id[store_id] = response.data
+    return response.data
+
+
+def invalidate(store_id: str) -> None:
+    """Drop cached entries for one store after a write."""
+    _by_id.pop(store_id, None)
+    _all_stores.pop("all", None)
+    evict_store(store_id)
+
+
+def invalidate_all() -> None:
+    """Drop the whole store cache (e.g. after a create)."""
+    _by_id.clear()
+    _all_stores.pop("all", None)
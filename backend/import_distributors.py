@@ -6,16 +6,21 @@ Usage: python import_distributors.py distributors.csv
 import csv
 import sys
 import requests
-import json
-from datetime import datetime
+import orjson
+from itertools import chain, islice
 
 # Backend API endpoint (latest deployment)
 API_URL = "https://backend-fdr4fnd9c-01101001rajs-projects.vercel.app/api/v1/distributors/bulk-import"
 
-def read_csv(filename):
-    """Read CSV file and convert to distributor objects"""
-    distributors = []
+# Rows sent per request; keeps memory flat for large CSVs and bounds the
+# blast radius of a failed request to one batch
+BATCH_SIZE = 500
+
+# One session for all batches so the TCP+TLS handshake is paid once
+session = requests.Session()
 
+def read_csv(filename):
+    """Yield distributor objects from the CSV one row at a time"""
     with open(filename, 'r', encoding='utf-8') as file:
         # Use comma delimiter for CSV
         reader = csv.DictReader(file, delimiter=',')
@@ -26,7 +31,7 @@ def read_csv(filename):
                 continue
 
             # Map CSV columns to API format
-            distributor = {
+            yield {
                 "agentCode": row.get("code", "").strip(),  # Use code from CSV as agent code
                 "name": row.get("name", "").strip(),
                 "phone": row.get("phone", "").strip(),
@@ -42,42 +47,57 @@ def read_csv(filename):
                 "storeId": None  # Optional
             }
 
-            distributors.append(distributor)
-
-    return distributors
-
-def import_distributors(distributors):
-    """Send bulk import request to API"""
+def import_batch(batch):
+    """Send one bulk import request to the API"""
     headers = {
         "Content-Type": "application/json"
     }
 
-    print(f"Importing {len(distributors)} distributors...")
-
     try:
-        response = requests.post(API_URL, json=distributors, headers=headers)
+        response = session.post(API_URL, json=batch, headers=headers)
         response.raise_for_status()
-
-        result = response.json()
-        print(f"\nSUCCESS!")
-        print(f"Created: {result['created_count']} distributors")
-        print(f"Errors: {result['error_count']}")
-
-        if result.get('errors'):
-            print("\nErrors:")
-            for error in result['errors']:
-                print(f"  - {error}")
-
-        print(f"\nNext agent code will be: {result['next_agent_code']}")
-
-        return result
+        return orjson.loads(response.content)
 
     except requests.exceptions.RequestException as e:
         print(f"ERROR: {e}")
-        if hasattr(e.response, 'text'):
+        if getattr(e, 'response', None) is not None:
             print(f"Response: {e.response.text}")
         return None
 
+def import_distributors(batches):
+    """Import batches one at a time and aggregate the results"""
+    created = 0
+    errors = []
+    next_agent_code = None
+
+    for i, batch in enumerate(batches, start=1):
+        print(f"Importing batch {i} ({len(batch)} distributors)...")
+        result = import_batch(batch)
+        if result is None:
+            print(f"Batch {i} failed; stopping. {created} distributors were created before the failure.")
+            return
+
+        created += result['created_count']
+        errors.extend(result.get('errors') or [])
+        next_agent_code = result.get('next_agent_code')
+
+    print(f"\nSUCCESS!")
+    print(f"Created: {created} distributors")
+    print(f"Errors: {len(errors)}")
+
+    if errors:
+        print("\nErrors:")
+        for error in errors:
+            print(f"  - {error}")
+
+    print(f"\nNext agent code will be: {next_agent_code}")
+
+def batched(iterable, size):
+    """Yield lists of up to `size` items from the iterable"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
 if __name__ == "__main__":
     if len(sys.argv) != 2:
         print("Usage: python import_distributors.py <csv_file>")
@@ -86,17 +106,20 @@ if __name__ == "__main__":
     csv_file = sys.argv[1]
 
     print(f"Reading CSV file: {csv_file}")
-    distributors = read_csv(csv_file)
+    batches = batched(read_csv(csv_file), BATCH_SIZE)
 
-    print(f"Found {len(distributors)} distributors")
+    # Pull the first batch up front so we can preview without loading
+    # the whole file
+    first_batch = next(batches, None)
+    if not first_batch:
+        print("No distributors found")
+        sys.exit(1)
 
-    # Preview first distributor
-    if distributors:
-        print("\nPreview of first distributor:")
-        print(json.dumps(distributors[0], indent=2))
+    print("\nPreview of first distributor:")
+    print(orjson.dumps(first_batch[0], option=orjson.OPT_INDENT_2).decode())
 
-        confirm = input("\nProceed with import? (yes/no): ")
-        if confirm.lower() == 'yes':
-            import_distributors(distributors)
-        else:
-            print("Import cancelled")
+    confirm = input("\nProceed with import? (yes/no): ")
+    if confirm.lower() == 'yes':
+        import_distributors(chain([first_batch], batches))
+    else:
+        print("Import cancelled")
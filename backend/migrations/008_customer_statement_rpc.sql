@@ -0,0 +1,55 @@
+-- Migration: Fetch all customer-statement data in a single RPC
+-- Collapses the three ordered queries issued by
+-- GET /reports/customer-statement/{distributor_id}
+-- (orders + items, wallet transactions, opening balance) into one
+-- database round trip.
+
+CREATE OR REPLACE FUNCTION get_customer_statement_data(
+    p_distributor_id uuid,
+    p_start_date timestamptz,
+    p_end_date timestamptz
+)
+RETURNS json
+LANGUAGE sql
+STABLE
+AS $$
+SELECT json_build_object(
+    'orders', COALESCE((
+        SELECT json_agg(row_to_json(o) ORDER BY o.date)
+        FROM (
+            SELECT
+                ord.id,
+                ord.date,
+                ord.total_amount,
+                ord.shipment_size,
+                COALESCE((
+                    SELECT json_agg(json_build_object(
+                        'sku_id', oi.sku_id,
+                        'quantity', oi.quantity
+                    ))
+                    FROM order_items oi
+                    WHERE oi.order_id = ord.id
+                ), '[]'::json) AS order_items
+            FROM orders ord
+            WHERE ord.distributor_id = p_distributor_id
+              AND ord.date >= p_start_date
+              AND ord.date <= p_end_date
+        ) o
+    ), '[]'::json),
+    'transactions', COALESCE((
+        SELECT json_agg(row_to_json(wt) ORDER BY wt.date)
+        FROM wallet_transactions wt
+        WHERE wt.distributor_id = p_distributor_id
+          AND wt.date >= p_start_date
+          AND wt.date <= p_end_date
+    ), '[]'::json),
+    'opening_balance', COALESCE((
+        SELECT wt.balance_after
+        FROM wallet_transactions wt
+        WHERE wt.distributor_id = p_distributor_id
+          AND wt.date < p_start_date
+        ORDER BY wt.date DESC
+        LIMIT 1
+    ), 0)
+);
+$$;
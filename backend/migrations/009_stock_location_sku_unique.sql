@@ -0,0 +1,7 @@
+-- Migration: Composite unique index on stock(locationId, skuId)
+-- Required so bulk writes can use INSERT ... ON CONFLICT ("locationId", "skuId")
+-- instead of a read-modify-write round trip per SKU. Also turns the hot
+-- per-location/per-SKU lookups into index scans.
+
+CREATE UNIQUE INDEX IF NOT EXISTS stock_location_sku_key
+    ON public.stock ("locationId", "skuId");
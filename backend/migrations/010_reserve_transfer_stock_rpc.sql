@@ -0,0 +1,42 @@
+-- Migration: Validate and reserve transfer stock in one atomic RPC
+-- Replaces the per-SKU "select stock, check availability, update reserved"
+-- loop in POST /stock/transfers with a single statement that locks the
+-- affected rows, verifies availability and bumps the reservations, so
+-- concurrent transfers cannot both reserve the same units.
+
+CREATE OR REPLACE FUNCTION reserve_transfer_stock(
+    p_location_id text,
+    p_items jsonb
+)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    insufficient text[];
+BEGIN
+    -- Lock the affected stock rows for this transaction
+    PERFORM 1
+    FROM stock s
+    WHERE s."locationId" = p_location_id
+      AND s."skuId" IN (SELECT i->>'skuId' FROM jsonb_array_elements(p_items) AS i)
+    FOR UPDATE;
+
+    SELECT array_agg(i->>'skuId')
+    INTO insufficient
+    FROM jsonb_array_elements(p_items) AS i
+    LEFT JOIN stock s
+        ON s."locationId" = p_location_id AND s."skuId" = i->>'skuId'
+    WHERE s."skuId" IS NULL
+       OR (s.quantity - s.reserved) < (i->>'quantity')::int;
+
+    IF insufficient IS NOT NULL THEN
+        RAISE EXCEPTION 'Insufficient stock for SKU %', array_to_string(insufficient, ', ');
+    END IF;
+
+    UPDATE stock s
+    SET reserved = s.reserved + (i->>'quantity')::int
+    FROM jsonb_array_elements(p_items) AS i
+    WHERE s."locationId" = p_location_id
+      AND s."skuId" = i->>'skuId';
+END;
+$$;
@@ -0,0 +1,44 @@
+-- Migration: Deliver a stock transfer in one atomic RPC
+-- Replaces the per-item loop in PUT /stock/transfers/{id}/status
+-- (plant deduction, store insert-or-update, status update) with a single
+-- set-based transaction - 3 statements total instead of 4+ queries per item.
+
+CREATE OR REPLACE FUNCTION deliver_stock_transfer(p_transfer_id text)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_store_id text;
+    plant_id constant text := '00000000-0000-0000-0000-000000000000';
+BEGIN
+    SELECT "destinationStoreId" INTO v_store_id
+    FROM stock_transfers
+    WHERE id = p_transfer_id;
+
+    IF v_store_id IS NULL THEN
+        RAISE EXCEPTION 'Transfer % not found', p_transfer_id;
+    END IF;
+
+    -- Deduct delivered quantity and release the reservation at the plant
+    UPDATE stock s
+    SET quantity = s.quantity - i.quantity,
+        reserved = s.reserved - i.quantity
+    FROM stock_transfer_items i
+    WHERE i."transferId" = p_transfer_id
+      AND s."locationId" = plant_id
+      AND s."skuId" = i."skuId";
+
+    -- Add to store stock (insert new rows or increment existing ones)
+    INSERT INTO stock ("locationId", "skuId", quantity, reserved)
+    SELECT v_store_id, i."skuId", i.quantity, 0
+    FROM stock_transfer_items i
+    WHERE i."transferId" = p_transfer_id
+    ON CONFLICT ("locationId", "skuId")
+    DO UPDATE SET quantity = stock.quantity + EXCLUDED.quantity;
+
+    UPDATE stock_transfers
+    SET status = 'Delivered',
+        "deliveredDate" = now()
+    WHERE id = p_transfer_id;
+END;
+$$;
@@ -0,0 +1,7 @@
+-- Migration: Index stock_transfers by date
+-- GET /stock/transfers filters and orders on date; this turns the full
+-- scan + sort into a backwards index scan, which also makes keyset
+-- pagination (date < cursor) cheap.
+
+CREATE INDEX IF NOT EXISTS stock_transfers_date_idx
+    ON public.stock_transfers (date DESC);
@@ -0,0 +1,23 @@
+-- Migration: Relative stock adjustment with RETURNING
+-- The order deliver/cancel paths did a SELECT of quantity/reserved
+-- followed by an absolute UPDATE per SKU. This function applies the
+-- deltas in one statement and returns the new row, halving the round
+-- trips and removing the read-modify-write race.
+
+CREATE OR REPLACE FUNCTION adjust_stock_item(
+    p_location_id text,
+    p_sku_id character varying,
+    p_quantity_delta integer,
+    p_reserved_delta integer
+)
+RETURNS SETOF stock_items
+LANGUAGE sql
+AS $$
+UPDATE stock_items
+SET quantity = quantity + p_quantity_delta,
+    -- Clamp reservations at zero (matches the cancel path's guard)
+    reserved = GREATEST(reserved + p_reserved_delta, 0)
+WHERE location_id = p_location_id
+  AND sku_id = p_sku_id
+RETURNING *;
+$$;
@@ -0,0 +1,7 @@
+-- Migration: Let Postgres stamp ledger and transfer dates
+-- The API was sending datetime.utcnow().isoformat() with every insert.
+-- A DB-side default is set at commit time, keeps ledger timestamps
+-- monotonic, and lets the app drop the column from insert payloads.
+
+ALTER TABLE stock_ledger ALTER COLUMN date SET DEFAULT now();
+ALTER TABLE stock_transfers ALTER COLUMN date SET DEFAULT now();
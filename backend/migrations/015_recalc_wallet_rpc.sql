@@ -0,0 +1,64 @@
+-- Migration: Recalculate wallet running balances in one statement
+-- recharge_wallet / record_journal_voucher / recalculate_wallet_balances
+-- looped over every historical transaction issuing one UPDATE per row.
+-- This function rewrites balance_after with a window function and syncs
+-- the account's wallet_balance, turning N round trips into one RPC.
+
+CREATE OR REPLACE FUNCTION recalc_wallet_balances(
+    p_account_type text,
+    p_account_id uuid
+)
+RETURNS TABLE (final_balance numeric, transactions_updated integer)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_final numeric := 0;
+    v_count integer := 0;
+BEGIN
+    IF p_account_type = 'distributor' THEN
+        WITH ordered AS (
+            SELECT id,
+                   -- amounts are stored signed, so the running balance is
+                   -- a plain prefix sum (id breaks date ties)
+                   SUM(amount) OVER (ORDER BY date, id) AS bal
+            FROM wallet_transactions
+            WHERE distributor_id = p_account_id
+        )
+        UPDATE wallet_transactions wt
+        SET balance_after = ordered.bal
+        FROM ordered
+        WHERE wt.id = ordered.id;
+        GET DIAGNOSTICS v_count = ROW_COUNT;
+
+        SELECT COALESCE(SUM(amount), 0) INTO v_final
+        FROM wallet_transactions
+        WHERE distributor_id = p_account_id;
+
+        UPDATE distributors SET wallet_balance = v_final WHERE id = p_account_id;
+
+    ELSIF p_account_type = 'store' THEN
+        WITH ordered AS (
+            SELECT id,
+                   SUM(amount) OVER (ORDER BY date, id) AS bal
+            FROM wallet_transactions
+            WHERE store_id = p_account_id
+        )
+        UPDATE wallet_transactions wt
+        SET balance_after = ordered.bal
+        FROM ordered
+        WHERE wt.id = ordered.id;
+        GET DIAGNOSTICS v_count = ROW_COUNT;
+
+        SELECT COALESCE(SUM(amount), 0) INTO v_final
+        FROM wallet_transactions
+        WHERE store_id = p_account_id;
+
+        UPDATE stores SET wallet_balance = v_final WHERE id = p_account_id;
+
+    ELSE
+        RAISE EXCEPTION 'account_type must be distributor or store';
+    END IF;
+
+    RETURN QUERY SELECT v_final, v_count;
+END;
+$$;
@@ -0,0 +1,65 @@
+-- Migration: Maintain wallet running balances with insert triggers
+-- With migration 015 a recharge still cost an insert plus a full
+-- ledger rewrite. The running balance is pure SQL semantics, so these
+-- triggers stamp balance_after on each inserted row, shift any
+-- later-dated rows (backdated entries), and keep the account's
+-- wallet_balance in sync. The endpoints now just INSERT; the
+-- recalc_wallet_balances RPC remains as a manual repair tool.
+
+CREATE OR REPLACE FUNCTION wallet_tx_balance_before()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- amounts are stored signed, so the new balance is the previous
+    -- row's balance plus the amount
+    NEW.balance_after := COALESCE((
+        SELECT balance_after
+        FROM wallet_transactions
+        WHERE ((NEW.distributor_id IS NOT NULL AND distributor_id = NEW.distributor_id)
+            OR (NEW.store_id IS NOT NULL AND store_id = NEW.store_id))
+          AND date <= NEW.date
+        ORDER BY date DESC, id DESC
+        LIMIT 1
+    ), 0) + NEW.amount;
+    RETURN NEW;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION wallet_tx_balance_after()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- A backdated insert shifts every later row by the signed amount
+    UPDATE wallet_transactions
+    SET balance_after = balance_after + NEW.amount
+    WHERE ((NEW.distributor_id IS NOT NULL AND distributor_id = NEW.distributor_id)
+        OR (NEW.store_id IS NOT NULL AND store_id = NEW.store_id))
+      AND date > NEW.date;
+
+    IF NEW.distributor_id IS NOT NULL THEN
+        UPDATE distributors
+        SET wallet_balance = wallet_balance + NEW.amount
+        WHERE id = NEW.distributor_id;
+    ELSIF NEW.store_id IS NOT NULL THEN
+        UPDATE stores
+        SET wallet_balance = wallet_balance + NEW.amount
+        WHERE id = NEW.store_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS wallet_tx_balance_before_trg ON wallet_transactions;
+CREATE TRIGGER wallet_tx_balance_before_trg
+    BEFORE INSERT ON wallet_transactions
+    FOR EACH ROW
+    EXECUTE FUNCTION wallet_tx_balance_before();
+
+DROP TRIGGER IF EXISTS wallet_tx_balance_after_trg ON wallet_transactions;
+CREATE TRIGGER wallet_tx_balance_after_trg
+    AFTER INSERT ON wallet_transactions
+    FOR EACH ROW
+    EXECUTE FUNCTION wallet_tx_balance_after();
@@ -0,0 +1,53 @@
+-- Migration: Record a wallet transaction in one round trip
+-- recharge_wallet / record_journal_voucher still issued a SELECT for
+-- the existence check and then the INSERT. This function does both in
+-- one transaction and returns the account's new balance (the triggers
+-- from migration 016 maintain balance_after and wallet_balance).
+
+CREATE OR REPLACE FUNCTION record_wallet_transaction(
+    p_account_type text,
+    p_account_id uuid,
+    p_date timestamptz,
+    p_type text,
+    p_amount numeric,
+    p_payment_method text,
+    p_remarks text,
+    p_user text
+)
+RETURNS numeric
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_balance numeric;
+BEGIN
+    IF p_account_type = 'distributor' THEN
+        IF NOT EXISTS (SELECT 1 FROM distributors WHERE id = p_account_id) THEN
+            RAISE EXCEPTION 'Distributor not found';
+        END IF;
+
+        INSERT INTO wallet_transactions
+            (distributor_id, date, type, amount, payment_method, remarks, initiated_by)
+        VALUES
+            (p_account_id, p_date, p_type, p_amount, p_payment_method, p_remarks, p_user);
+
+        SELECT wallet_balance INTO v_balance FROM distributors WHERE id = p_account_id;
+
+    ELSIF p_account_type = 'store' THEN
+        IF NOT EXISTS (SELECT 1 FROM stores WHERE id = p_account_id) THEN
+            RAISE EXCEPTION 'Store not found';
+        END IF;
+
+        INSERT INTO wallet_transactions
+            (store_id, date, type, amount, payment_method, remarks, initiated_by)
+        VALUES
+            (p_account_id, p_date, p_type, p_amount, p_payment_method, p_remarks, p_user);
+
+        SELECT wallet_balance INTO v_balance FROM stores WHERE id = p_account_id;
+
+    ELSE
+        RAISE EXCEPTION 'account_type must be distributor or store';
+    END IF;
+
+    RETURN v_balance;
+END;
+$$;
@@ -0,0 +1,10 @@
+-- Migration: Join wallet transactions to their distributor's store
+-- The store-portal filter in get_wallet_transactions fetched every
+-- distributor id for the store and sent the array back in an in_()
+-- filter - two round trips and an unbounded id list. This view lets
+-- the endpoint filter on the store in a single query.
+
+CREATE OR REPLACE VIEW wallet_transactions_with_store AS
+SELECT wt.*, d.store_id AS derived_store_id
+FROM wallet_transactions wt
+LEFT JOIN distributors d ON d.id = wt.distributor_id;
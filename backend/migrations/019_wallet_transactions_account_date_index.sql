@@ -0,0 +1,12 @@
+-- Migration: Composite indexes for per-account wallet queries
+-- Every hot wallet query filters by account and orders by date: the
+-- /transactions listing, the recalc window function (migration 015)
+-- and the previous-row lookup in the balance trigger (migration 016).
+-- A composite btree lets Postgres filter and order in one index scan
+-- instead of a sequential scan plus sort.
+
+CREATE INDEX IF NOT EXISTS idx_wallet_tx_distributor_date
+    ON wallet_transactions (distributor_id, date);
+
+CREATE INDEX IF NOT EXISTS idx_wallet_tx_store_date
+    ON wallet_transactions (store_id, date);
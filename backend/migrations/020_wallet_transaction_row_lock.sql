@@ -0,0 +1,58 @@
+-- Migration: Serialize concurrent wallet writes per account
+-- Two concurrent recharges could both read the same previous row in
+-- the balance trigger and stamp conflicting balance_after values.
+-- Locking the account row at the top of record_wallet_transaction
+-- makes concurrent writes to one wallet queue up behind each other
+-- while leaving other accounts untouched.
+
+CREATE OR REPLACE FUNCTION record_wallet_transaction(
+    p_account_type text,
+    p_account_id uuid,
+    p_date timestamptz,
+    p_type text,
+    p_amount numeric,
+    p_payment_method text,
+    p_remarks text,
+    p_user text
+)
+RETURNS numeric
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_balance numeric;
+BEGIN
+    IF p_account_type = 'distributor' THEN
+        -- FOR UPDATE doubles as the existence check and the per-account
+        -- write lock held until commit
+        PERFORM 1 FROM distributors WHERE id = p_account_id FOR UPDATE;
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'Distributor not found';
+        END IF;
+
+        INSERT INTO wallet_transactions
+            (distributor_id, date, type, amount, payment_method, remarks, initiated_by)
+        VALUES
+            (p_account_id, p_date, p_type, p_amount, p_payment_method, p_remarks, p_user);
+
+        SELECT wallet_balance INTO v_balance FROM distributors WHERE id = p_account_id;
+
+    ELSIF p_account_type = 'store' THEN
+        PERFORM 1 FROM stores WHERE id = p_account_id FOR UPDATE;
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'Store not found';
+        END IF;
+
+        INSERT INTO wallet_transactions
+            (store_id, date, type, amount, payment_method, remarks, initiated_by)
+        VALUES
+            (p_account_id, p_date, p_type, p_amount, p_payment_method, p_remarks, p_user);
+
+        SELECT wallet_balance INTO v_balance FROM stores WHERE id = p_account_id;
+
+    ELSE
+        RAISE EXCEPTION 'account_type must be distributor or store';
+    END IF;
+
+    RETURN v_balance;
+END;
+$$;
@@ -0,0 +1,6 @@
+-- Migration: Index the unfiltered wallet transaction listing
+-- Complements migration 019: /transactions with no account filter still
+-- orders the whole table by date DESC, so give that path its own btree.
+
+CREATE INDEX IF NOT EXISTS idx_wallet_tx_date_desc
+    ON wallet_transactions (date DESC);
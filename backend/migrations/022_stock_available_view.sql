@@ -0,0 +1,13 @@
+-- Migration: Filter low-stock scans server-side
+-- The stock alert service downloaded every stock row and filtered
+-- quantity - reserved < threshold in Python. A view with the computed
+-- availability lets PostgREST apply the threshold (and the sort) in
+-- the database, so only the rows that are actually low travel over
+-- the wire. PostgREST still resolves the skus embed through the
+-- underlying foreign key.
+
+CREATE OR REPLACE VIEW v_stock_available AS
+SELECT
+    s.*,
+    s.quantity - COALESCE(s.reserved, 0) AS available
+FROM stock s;
@@ -0,0 +1,15 @@
+-- Migration: Aggregate last order dates in the database
+-- The "is this distributor active" check needs only the newest order
+-- date per distributor, but callers fetched every order row and folded
+-- them down in Python. One GROUP BY returns a single row per
+-- distributor instead.
+
+CREATE OR REPLACE FUNCTION get_last_order_per_distributor()
+RETURNS TABLE(distributor_id uuid, last_order timestamptz)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT o.distributor_id, MAX(o.date) AS last_order
+    FROM orders o
+    GROUP BY o.distributor_id;
+$$;
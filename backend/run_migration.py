@@ -1,12 +1,12 @@
 """
 Migration runner script with PostgreSQL direct connection
-Usage: python run_migration.py 007_fix_order_items_sku_id
+Usage: python run_migration.py 007_fix_order_items_sku_id [--show]
 """
 import sys
 import os
 from pathlib import Path
 
-def run_migration(migration_name: str):
+def run_migration(migration_name: str, show_sql: bool = False):
     """Run a SQL migration by name"""
     migrations_dir = Path(__file__).parent / "migrations"
     migration_file = migrations_dir / f"{migration_name}.sql"
@@ -15,11 +15,14 @@ def run_migration(migration_name: str):
         print(f"ERROR: Migration file {migration_name}.sql not found")
         sys.exit(1)
 
-    print(f"Reading migration: {migration_file}")
-    with open(migration_file, 'r') as f:
-        sql_content = f.read()
+    # Only load and echo the SQL on request - the default path just
+    # prints the psql instructions and doesn't need the file contents
+    if show_sql:
+        print(f"Reading migration: {migration_file}")
+        with open(migration_file, 'r') as f:
+            sql_content = f.read()
 
-    print(f"\nMigration SQL:\n{'='*60}\n{sql_content}\n{'='*60}\n")
+        print(f"\nMigration SQL:\n{'='*60}\n{sql_content}\n{'='*60}\n")
 
     try:
         import psycopg2
@@ -50,9 +53,9 @@ def run_migration(migration_name: str):
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python run_migration.py <migration_name>")
+        print("Usage: python run_migration.py <migration_name> [--show]")
         print("Example: python run_migration.py 007_fix_order_items_sku_id")
         sys.exit(1)
 
     migration_name = sys.argv[1]
-    run_migration(migration_name)
+    run_migration(migration_name, show_sql="--show" in sys.argv[2:])
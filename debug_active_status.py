@@ -46,12 +46,10 @@ except Exception as e:
 print("\n--- Checking Active/Inactive Logic ---")
 # 2. Simulate the backend logic for all distributors
 try:
-    orders_response = supabase.table("orders").select("distributor_id, date").order("date", desc=True).execute()
-    last_order_map = {}
-    for order in orders_response.data:
-        d_id = order.get("distributor_id")
-        if d_id not in last_order_map:
-            last_order_map[d_id] = order.get("date")
+    # One GROUP BY in the database (migration 023) instead of pulling
+    # every order row and folding them down here
+    orders_response = supabase.rpc("get_last_order_per_distributor").execute()
+    last_order_map = {row["distributor_id"]: row["last_order"] for row in orders_response.data}
 
     print(f"Found {len(last_order_map)} distributors with orders.")
     
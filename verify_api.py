@@ -1,19 +1,22 @@
 import requests
-import json
+import orjson
 import sys
 
 API_URL = "http://localhost:8000/api/v1/companies/primary"
 
+# One session so repeat calls reuse the pooled connection
+session = requests.Session()
+
 def verify_primary_company():
     print(f"Testing API Endpoint: {API_URL}")
     try:
-        response = requests.get(API_URL)
+        response = session.get(API_URL)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print("\nSUCCESS: Retrieved Primary Company Details:")
-            print(json.dumps(data, indent=2))
+            print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
             
             if data.get("name") == "GENERIC DAIRY PLANT":
                 print("\nWARNING: The returned name is still 'GENERIC DAIRY PLANT'.")